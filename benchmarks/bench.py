@@ -0,0 +1,267 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+from tabulate import tabulate
+from mlb_odds.arbitrage import ArbitrageCalculator
+from mlb_odds.batch import BatchEVCalculator
+from mlb_odds.calculator import EVCalculator
+from mlb_odds.models import GameOdds
+from .synthetic import MARKETS, generate_payload
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# games x bookmakers
+SCALES = ('10x10', '100x20', '500x30')
+
+def parse_scale(value):
+    """(games, bookmakers) of a scale written as GAMESxBOOKMAKERS"""
+    try:
+        games, bookmakers = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid scale {value!r}, expected GAMESxBOOKMAKERS, e.g. 100x20")
+    return games, bookmakers
+
+def parse_games(payload):
+    return [GameOdds.from_api(event) for event in payload]
+
+def best_odds(games):
+    """get_best_odds for every outcome of every market, the way the reports look prices up"""
+    for game in games:
+        for market, names in (('h2h', (game.home_team, game.away_team)), ('totals', ('Over', 'Under'))):
+            for name in names:
+                game.get_best_odds(name, market)
+        for name in (game.home_team, game.away_team):
+            for point in (-2.5, -1.5, 1.5, 2.5):
+                game.get_best_odds(name, 'spreads', point)
+
+# name -> (function, whether it takes the raw payload instead of parsed games)
+STAGES = {
+    'from_api': (parse_games, True),
+    'get_best_odds': (best_odds, False),
+    'find_arbitrage_opportunities': (EVCalculator.find_arbitrage_opportunities, False),
+    'find_arbitrage': (ArbitrageCalculator.find_arbitrage, False),
+    'find_best_value_bets': (EVCalculator.find_best_value_bets, False),
+    'batch_find_best_value_bets': (BatchEVCalculator.find_best_value_bets, False),
+}
+
+def reference_workload(pairs):
+    """
+    Plain Python work independent of the package: dict updates, float maths and a sort
+
+    Timed in every run so stage timings can be compared with a baseline from
+    a faster or slower (or busier) machine.
+    """
+    totals = {}
+    for key, price in pairs:
+        totals[key] = totals.get(key, 0.0) + 1 / price
+    return sorted(totals.items(), key=lambda item: item[1])
+
+REFERENCE_INPUT = [(i % 1000, 1.5 + (i % 97) / 10) for i in range(100000)]
+
+def time_reference(repeat=5):
+    """Seconds per call of the reference workload"""
+    return time_stage(reference_workload, REFERENCE_INPUT, repeat)
+
+def count_outcomes(payload):
+    return sum(
+        len(market['outcomes'])
+        for event in payload
+        for bookmaker in event['bookmakers']
+        for market in bookmaker['markets']
+    )
+
+def time_stage(function, argument, repeat, min_time=0.05):
+    """
+    Seconds per call, the fastest of several measurements
+
+    Each measurement loops until it has run for at least min_time so fast
+    stages are not lost in timer noise, and, as in timeit, the garbage
+    collector is paused while it runs.
+    """
+    number = 1
+    while True:
+        seconds = timeit.Timer(lambda: function(argument)).timeit(number)
+        if seconds >= min_time:
+            break
+        number *= 2 if seconds * 10 > min_time else 10
+
+    best = seconds / number
+    for _ in range(repeat - 1):
+        best = min(best, timeit.Timer(lambda: function(argument)).timeit(number) / number)
+    return best
+
+def peak_memory(function, argument):
+    """Peak bytes allocated by one run, including whatever the result keeps alive"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+def run_benchmarks(scales, stages=None, repeat=5, payloads=None):
+    """
+    Time every stage and measure its peak memory at each scale
+
+    Args:
+        scales (list): (games, bookmakers) pairs
+        stages (list): Stage names to run, None for all
+        repeat (int): Measurements per stage; the fastest is kept
+        payloads (dict): Label -> payload to benchmark instead of generating
+            one per scale, e.g. fixtures captured from the API
+
+    Returns:
+        dict: "label/stage" -> {games, outcomes, seconds, games_per_second, outcomes_per_second, peak_kib}
+    """
+    if payloads is None:
+        payloads = {
+            f"{games}x{bookmakers}": generate_payload(games, bookmakers, MARKETS)
+            for games, bookmakers in scales
+        }
+
+    results = {}
+    for label, payload in payloads.items():
+        games = parse_games(payload)
+        outcomes = count_outcomes(payload)
+
+        for name, (function, takes_payload) in STAGES.items():
+            if stages and name not in stages:
+                continue
+
+            argument = payload if takes_payload else games
+            seconds = time_stage(function, argument, repeat)
+            results[f"{label}/{name}"] = {
+                'games': len(games),
+                'outcomes': outcomes,
+                'seconds': seconds,
+                'games_per_second': len(games) / seconds if seconds else float('inf'),
+                'outcomes_per_second': outcomes / seconds if seconds else float('inf'),
+                'peak_kib': peak_memory(function, argument) / 1024,
+            }
+
+    return results
+
+def compare(results, baseline, tolerance, reference=None, base_reference=None):
+    """
+    Compare results with a baseline
+
+    With both reference timings, throughput is measured relative to the
+    reference workload of the same run, so a machine that is uniformly
+    faster or slower than the baseline's does not show up as a change.
+
+    Args:
+        results (dict): Output of run_benchmarks
+        baseline (dict): Results stored with save_baseline
+        tolerance (float): Allowed relative throughput drop or memory growth
+        reference (float): Seconds per reference workload in this run
+        base_reference (float): Seconds per reference workload when the baseline was saved
+
+    Returns:
+        list: (key, throughput ratio, memory ratio, regressed) for every key in both
+    """
+    scale = reference / base_reference if reference and base_reference else 1.0
+    rows = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+
+        speed = result['outcomes_per_second'] / base['outcomes_per_second'] * scale
+        memory = result['peak_kib'] / base['peak_kib'] if base['peak_kib'] else 1.0
+        regressed = speed < 1 - tolerance or memory > 1 + tolerance
+        rows.append((key, speed, memory, regressed))
+
+    return rows
+
+def load_baseline(path):
+    """(results, reference seconds or None for baselines saved without one)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data['results'], data.get('reference_seconds')
+
+def save_baseline(path, results, reference):
+    data = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'reference_seconds': reference,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def display_results(results, comparison):
+    ratios = {key: (speed, memory, regressed) for key, speed, memory, regressed in comparison}
+    rows = []
+
+    for key, result in results.items():
+        speed, memory, regressed = ratios.get(key, (None, None, False))
+        rows.append([
+            key,
+            f"{result['seconds'] * 1000:.2f}",
+            f"{result['games_per_second']:,.0f}",
+            f"{result['outcomes_per_second']:,.0f}",
+            f"{result['peak_kib']:,.0f}",
+            f"{speed:.2f}x" if speed is not None else "",
+            f"{memory:.2f}x" if memory is not None else "",
+            "REGRESSION" if regressed else "",
+        ])
+
+    print(tabulate(
+        rows,
+        headers=["Scale/Stage", "ms", "Games/s", "Outcomes/s", "Peak KiB", "Speed vs Base", "Memory vs Base", ""],
+        tablefmt="pretty"
+    ))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing and the calculators on synthetic slates")
+    parser.add_argument("--scales", type=parse_scale, nargs="+", default=[parse_scale(scale) for scale in SCALES], help="Slate sizes as GAMESxBOOKMAKERS (default: %s)" % " ".join(SCALES))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="Stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per stage; the fastest is reported (default: %(default)s)")
+    parser.add_argument("--fixture", type=str, nargs="+", help="Benchmark saved API responses (JSON files) instead of synthetic slates")
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH, help="Baseline results to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop or memory growth before a stage counts as a regression (default: %(default)s)")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero when a stage regressed (default: only report it)")
+    args = parser.parse_args()
+
+    payloads = None
+    if args.fixture:
+        payloads = {}
+        for path in args.fixture:
+            with open(path, 'r', encoding='utf-8') as f:
+                payloads[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+
+    reference = time_reference(args.repeat)
+    results = run_benchmarks(args.scales, stages=args.stages, repeat=args.repeat, payloads=payloads)
+
+    comparison = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        baseline, base_reference = load_baseline(args.baseline)
+        comparison = compare(results, baseline, args.tolerance, reference, base_reference)
+        if base_reference:
+            print(f"Reference workload: {reference * 1000:.2f} ms (baseline {base_reference * 1000:.2f} ms); speeds are relative to it")
+
+    display_results(results, comparison)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, reference)
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    regressions = [key for key, _, _, regressed in comparison if regressed]
+    if regressions:
+        print(f"\n{len(regressions)} stages regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        if args.strict:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+MARKETS = ('h2h', 'spreads', 'totals')
+
+# Slates start at a fixed time so timestamps never depend on when the generator runs
+START = datetime(2024, 6, 1, 17, 0, tzinfo=timezone.utc)
+
+CITIES = [
+    'Arlington', 'Atlanta', 'Baltimore', 'Boston', 'Chicago', 'Cincinnati', 'Cleveland', 'Denver',
+    'Detroit', 'Houston', 'Kansas City', 'Los Angeles', 'Miami', 'Milwaukee', 'Minneapolis',
+    'New York', 'Oakland', 'Philadelphia', 'Pittsburgh', 'San Diego', 'San Francisco', 'Seattle',
+    'St. Louis', 'Tampa Bay', 'Toronto', 'Washington',
+]
+NICKNAMES = ['Aces', 'Bears', 'Comets', 'Dukes', 'Eagles', 'Foxes', 'Giants', 'Hawks', 'Iron', 'Jets']
+
+def format_time(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def team_name(number):
+    return f"{CITIES[number % len(CITIES)]} {NICKNAMES[number // len(CITIES) % len(NICKNAMES)]}"
+
+def decimal_price(probability, margin, rng):
+    """Bookmaker price for a fair probability after its margin and a little noise"""
+    price = 1 / (probability * (1 + margin)) + rng.uniform(-0.04, 0.04)
+    return round(max(price, 1.01), 2)
+
+def two_way(names, probability, margin, rng, points=(None, None)):
+    outcomes = []
+    for name, fair, point in zip(names, (probability, 1 - probability), points):
+        outcome = {'name': name, 'price': decimal_price(fair, margin, rng)}
+        if point is not None:
+            outcome['point'] = point
+        outcomes.append(outcome)
+    return outcomes
+
+def generate_payload(n_games, n_bookmakers, markets=MARKETS, seed=0, sport='baseball_mlb'):
+    """
+    A list of events shaped like an Odds API /odds response
+
+    Every bookmaker prices every market around a shared fair probability with
+    its own margin. Spreads and totals use a main line with an occasional
+    alternate line, and a few prices are generous enough to form arbitrages.
+
+    Args:
+        n_games (int): Number of events
+        n_bookmakers (int): Bookmakers pricing each event
+        markets (tuple): Market keys to include (h2h, spreads, totals)
+        seed (int): Random seed; the payload is a pure function of the arguments
+        sport (str): sport_key of every event
+
+    Returns:
+        list: Event dicts as returned by the API
+    """
+    rng = random.Random(seed)
+    events = []
+
+    for number in range(n_games):
+        home_team = team_name(2 * number)
+        away_team = team_name(2 * number + 1)
+        commence_time = START + timedelta(minutes=20 * number)
+
+        home_probability = rng.uniform(0.3, 0.7)
+        spread = -1.5 if home_probability >= 0.5 else 1.5
+        total = rng.choice((7.5, 8.0, 8.5, 9.0, 9.5))
+        over_probability = rng.uniform(0.45, 0.55)
+
+        bookmakers = []
+        for book in range(n_bookmakers):
+            margin = rng.uniform(0.02, 0.07)
+            if rng.random() < 0.02:
+                margin = -0.04  # mispriced book
+            last_update = format_time(commence_time - timedelta(minutes=rng.randint(1, 180)))
+
+            book_markets = []
+            for market in markets:
+                if market == 'h2h':
+                    outcomes = two_way((home_team, away_team), home_probability, margin, rng)
+                elif market == 'spreads':
+                    point = spread if rng.random() < 0.85 else spread - 1.0
+                    cover = min(max(home_probability - 0.25 * (point + 1.5), 0.1), 0.9)
+                    outcomes = two_way((home_team, away_team), cover, margin, rng, points=(point, -point))
+                elif market == 'totals':
+                    point = total if rng.random() < 0.85 else total + 1.0
+                    over = min(max(over_probability - 0.1 * (point - total), 0.1), 0.9)
+                    outcomes = two_way(('Over', 'Under'), over, margin, rng, points=(point, point))
+                else:
+                    raise ValueError(f"Unknown market {market!r}, expected one of {MARKETS}")
+
+                book_markets.append({'key': market, 'last_update': last_update, 'outcomes': outcomes})
+
+            bookmakers.append({
+                'key': f"book{book:02d}",
+                'title': f"Book {book:02d}",
+                'last_update': last_update,
+                'markets': book_markets,
+            })
+
+        events.append({
+            'id': f"{seed:04d}{number:06d}",
+            'sport_key': sport,
+            'sport_title': 'MLB',
+            'commence_time': format_time(commence_time),
+            'home_team': home_team,
+            'away_team': away_team,
+            'bookmakers': bookmakers,
+        })
+
+    return events
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Odds API response as JSON")
+    parser.add_argument("--games", type=int, default=15, help="Number of events (default: %(default)s)")
+    parser.add_argument("--bookmakers", type=int, default=10, help="Bookmakers per event (default: %(default)s)")
+    parser.add_argument("--markets", type=str, default=",".join(MARKETS), help="Comma separated markets (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: %(default)s)")
+    args = parser.parse_args()
+
+    markets = tuple(market.strip() for market in args.markets.split(",") if market.strip())
+    json.dump(generate_payload(args.games, args.bookmakers, markets, args.seed), sys.stdout)
+    sys.stdout.write('\n')
+
+if __name__ == "__main__":
+    main()
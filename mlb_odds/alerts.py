@@ -0,0 +1,311 @@
+import hashlib
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from .config import (
+    ALERT_MIN_EDGE_CHANGE, ALERT_QUEUE_SIZE, ALERT_DEDUP_SIZE, ALERT_RETRIES, ALERT_RETRY_DELAY,
+    ALERT_RATE_LIMITS, ALERT_WEBHOOK_TIMEOUT,
+)
+from .metrics import metrics
+from .ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+def arbitrage_alert(opportunity):
+    """
+    Alert for an arbitrage opportunity
+
+    Accepts both ArbitrageCalculator.find_arbitrage results and the two-way
+    EVCalculator.find_arbitrage_opportunities format.
+    """
+    if 'outcomes' in opportunity:
+        legs = [(leg['name'], leg['point'], leg['bookmaker'], leg['odds']) for leg in opportunity['outcomes']]
+        market, line = opportunity['market'], opportunity['line']
+        edge = opportunity['return_pct']
+    else:
+        legs = [
+            (side['name'], None, side['bookmaker'], side['best_odds'])
+            for side in (opportunity['home_team'], opportunity['away_team'])
+        ]
+        market, line = 'h2h', None
+        edge = round((1 / sum(1 / odds for _, _, _, odds in legs) - 1) * 100, 2)
+
+    prices = ", ".join(f"{name}{'' if point is None else f' {point:+g}'} {odds} ({bookmaker})" for name, point, bookmaker, odds in legs)
+
+    return {
+        'kind': 'arbitrage',
+        'key': ('arbitrage', opportunity['game'], market, line, tuple(bookmaker for _, _, bookmaker, _ in legs)),
+        'prices': tuple(odds for _, _, _, odds in legs),
+        'edge': edge,
+        'game': opportunity['game'],
+        'message': f"Arbitrage {edge:.2f}% on {opportunity['game']} {market}: {prices}",
+        'opportunity': opportunity,
+    }
+
+def value_alert(bet):
+    """Alert for a value bet from find_best_value_bets"""
+    return {
+        'kind': 'value',
+        'key': ('value', bet['game'], bet['team'], (bet['bookmaker'],)),
+        'prices': (bet['odds'],),
+        'edge': bet['edge'],
+        'game': bet['game'],
+        'message': (
+            f"Value bet {bet['edge']:+.2f}% edge: {bet['team']} {bet['odds']} at {bet['bookmaker']} "
+            f"({bet['game']}, EV {bet['expected_value']:+.2f} per 100)"
+        ),
+        'opportunity': bet,
+    }
+
+class Deduplicator:
+    """
+    Remembers the last alerted edge of each opportunity
+
+    An opportunity is identified by its game, market (or team) and books; it
+    is alerted again only once its edge has moved by at least min_change
+    percentage points. Entries are forgotten least recently seen first.
+    """
+
+    def __init__(self, min_change=ALERT_MIN_EDGE_CHANGE, max_size=ALERT_DEDUP_SIZE):
+        self.min_change = min_change
+        self.max_size = max_size
+        self._seen = OrderedDict()  # key -> edge when last alerted
+
+    def __len__(self):
+        return len(self._seen)
+
+    def check(self, alert):
+        """Whether an alert is new or material, remembering it if so"""
+        key = alert['key']
+        previous = self._seen.get(key)
+
+        if previous is not None:
+            self._seen.move_to_end(key)
+            if abs(alert['edge'] - previous) < self.min_change:
+                return False
+
+        self._seen[key] = alert['edge']
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return True
+
+    @staticmethod
+    def fingerprint(alert):
+        """Stable id of an alert's game, books and prices, for receivers deduplicating themselves"""
+        return hashlib.sha1(repr((alert['key'], alert['prices'])).encode('utf-8')).hexdigest()[:16]
+
+class StdoutSink:
+    """Prints one line per alert"""
+
+    name = 'stdout'
+    label = 'stdout'
+
+    def send(self, alert):
+        print(f"ALERT {alert['message']}", file=sys.stdout, flush=True)
+
+class FileSink:
+    """Appends one JSON line per alert to a file"""
+
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+        self.label = f"file:{path}"
+
+    def send(self, alert):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alert) + '\n')
+
+class WebhookSink:
+    """POSTs each alert as JSON; any non-2xx response is retried"""
+
+    name = 'webhook'
+
+    def __init__(self, url, timeout=ALERT_WEBHOOK_TIMEOUT, session=None):
+        self.url = url
+        self.label = url
+        self.timeout = timeout
+        self._session = session
+
+    def send(self, alert):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+
+        response = self._session.post(self.url, json=alert, timeout=self.timeout)
+        response.raise_for_status()
+
+def parse_sink(value):
+    """A sink from an --alert value: stdout, a http(s):// webhook URL or a file path"""
+    if value == 'stdout':
+        return StdoutSink()
+    if value.startswith(('http://', 'https://')):
+        return WebhookSink(value)
+    return FileSink(value[len('file:'):] if value.startswith('file:') else value)
+
+class SinkWorker:
+    """A sink's queue and the thread delivering from it, rate limited and retried"""
+
+    def __init__(self, sink, rate=None, retries=ALERT_RETRIES, retry_delay=ALERT_RETRY_DELAY, queue_size=ALERT_QUEUE_SIZE):
+        self.sink = sink
+        self.limiter = RateLimiter(rate) if rate else None
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = {'delivered': 0, 'failed': 0, 'dropped': 0, 'last_latency': None, 'max_latency': 0.0}
+        # Drops are counted on publishing threads, deliveries on the worker thread
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"alerts-{sink.name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def put(self, alert):
+        """Queue an alert without ever blocking, dropping the oldest one when full"""
+        while True:
+            try:
+                self.queue.put_nowait(alert)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self._count('dropped')
+                except queue.Empty:
+                    pass
+
+    def stop(self, timeout=None):
+        """Deliver what is queued (within the timeout) and stop"""
+        self.put(_STOP)
+        self._thread.join(timeout)
+
+    def snapshot(self):
+        """A consistent copy of the delivery stats"""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _count(self, result):
+        with self._stats_lock:
+            self.stats[result] += 1
+        metrics.inc('alerts_total', sink=self.sink.name, result=result)
+
+    def _run(self):
+        while True:
+            alert = self.queue.get()
+            if alert is _STOP:
+                return
+            self._deliver(alert)
+
+    def _deliver(self, alert):
+        for attempt in range(self.retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            try:
+                self.sink.send(alert)
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error(f"Failed to deliver alert to {self.sink.name} after {attempt + 1} attempts: {e}")
+                    self._count('failed')
+                    return
+                time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                latency = (datetime.now(timezone.utc) - datetime.fromisoformat(alert['fetched_at'])).total_seconds()
+                with self._stats_lock:
+                    self.stats['last_latency'] = latency
+                    self.stats['max_latency'] = max(self.stats['max_latency'], latency)
+                metrics.observe('alert_latency_seconds', latency, sink=self.sink.name)
+                self._count('delivered')
+                return
+
+class AlertDispatcher:
+    """
+    Deduplicates new opportunities and hands them to every sink's background queue
+
+    publish only filters and enqueues, so a slow or failing sink never holds
+    up the poll that found the opportunity; each sink has its own thread,
+    rate limit and retries.
+    """
+
+    def __init__(self, sinks, kinds=('arbitrage', 'value'), min_edge_change=ALERT_MIN_EDGE_CHANGE,
+                 rate_limits=ALERT_RATE_LIMITS, queue_size=ALERT_QUEUE_SIZE):
+        """
+        Args:
+            sinks (list): Sinks with a name, a label and a send(alert) method (see StdoutSink, FileSink, WebhookSink)
+            kinds (tuple): Opportunity kinds to alert on, 'arbitrage' and/or 'value'
+            min_edge_change (float): Percentage points an edge must move before it is alerted again
+            rate_limits (dict): Sink name -> deliveries per second, None for unlimited
+            queue_size (int): Alerts waiting per sink before the oldest are dropped
+        """
+        self.kinds = kinds
+        self.dedup = Deduplicator(min_edge_change)
+        self.workers = [SinkWorker(sink, rate=rate_limits.get(sink.name), queue_size=queue_size) for sink in sinks]
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Give the sinks up to timeout seconds each to deliver what is queued"""
+        for worker in self.workers:
+            worker.stop(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def publish(self, arbitrage=(), value_bets=(), fetched_at=None):
+        """
+        Queue alerts for the new or materially changed opportunities
+
+        Args:
+            arbitrage (iterable): Arbitrage opportunities
+            value_bets (iterable): Value bets
+            fetched_at (datetime): When the odds behind them were fetched, now if None
+
+        Returns:
+            list: The alerts queued
+        """
+        fetched_at = (fetched_at or datetime.now(timezone.utc)).isoformat()
+        candidates = []
+        if 'arbitrage' in self.kinds:
+            candidates.extend(arbitrage_alert(opportunity) for opportunity in arbitrage)
+        if 'value' in self.kinds:
+            candidates.extend(value_alert(bet) for bet in value_bets)
+
+        queued = []
+        for alert in candidates:
+            if not self.dedup.check(alert):
+                continue
+
+            alert['fingerprint'] = self.dedup.fingerprint(alert)
+            alert['fetched_at'] = fetched_at
+            del alert['key'], alert['prices']
+            for worker in self.workers:
+                worker.put(alert)
+            queued.append(alert)
+
+        if queued:
+            logger.info(f"Queued {len(queued)} alerts")
+        return queued
+
+    def publish_events(self, events, fetched_at=None):
+        """Queue alerts for the added and updated opportunities of an OpportunityDetector update"""
+        changed = events['added'] + events['updated']
+        return self.publish(
+            arbitrage=[opportunity for kind, opportunity in changed if kind == 'arbitrage'],
+            value_bets=[opportunity for kind, opportunity in changed if kind == 'value'],
+            fetched_at=fetched_at
+        )
+
+    def stats(self):
+        """Delivery counts and latencies per sink, keyed by its label (stdout, file:<path> or the webhook URL)"""
+        return {worker.sink.label: worker.snapshot() for worker in self.workers}
@@ -1,56 +1,410 @@
-import requests
-from .config import API_KEY, API_BASE_URL, REGIONS, MARKETS, ODDS_FORMAT, DATE_FORMAT
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .config import (
+    API_KEY, API_BASE_URL, REGIONS, MARKETS, ODDS_FORMAT, DATE_FORMAT,
+    POOL_CONNECTIONS, POOL_MAXSIZE, REQUEST_TIMEOUT, MAX_CONCURRENCY, RATE_LIMIT,
+)
+from .metrics import metrics
+from .models import GameOdds, format_timestamp
+from .ratelimit import RateLimiter
+from .streaming import iter_json_array
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Response headers kept alongside cached bodies
+QUOTA_HEADERS = ('x-requests-remaining', 'x-requests-used')
+
+def iter_response(response, chunk_size):
+    """Body chunks of a streamed response, releasing its connection once read or abandoned"""
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
+
 class OddsApiClient:
     """Client for accessing the Odds API"""
-    
-    def __init__(self, api_key=API_KEY):
+
+    def __init__(self, api_key=API_KEY, base_url=API_BASE_URL, cache=None, session=None, rate_limiter=None, offline=False):
+        """
+        Args:
+            api_key (str): Odds API key
+            base_url (str): Base URL of the API
+            cache (ResponseCache): Optional on-disk response cache, None to always hit the API
+            session (requests.Session): Optional session to reuse, a pooled one is created on the first request otherwise
+            rate_limiter (RateLimiter): Limiter shared by every request made through this client
+            offline (bool): Only serve responses from the cache, never calling the API
+        """
         self.api_key = api_key
-        self.base_url = API_BASE_URL
-        
-    def get_sports(self):
-        """Get a list of available sports"""
-        url = f"{self.base_url}/sports"
-        
-        response = requests.get(
-            url,
-            params={
-                'api_key': self.api_key
-            }
-        )
-        
+        self.base_url = base_url
+        self.cache = cache
+        self.offline = offline
+        self._session = session
+        self.rate_limiter = rate_limiter or RateLimiter(RATE_LIMIT, burst=MAX_CONCURRENCY)
+        self.requests_remaining = None
+        self.requests_used = None
+        self._quota_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """HTTP session, created (and requests imported) on first use"""
+        if self._session is None:
+            self._session = self._create_session()
+        return self._session
+
+    @staticmethod
+    def _create_session():
+        """Create a session that keeps connections to the API alive between calls"""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def close(self):
+        """Close pooled connections"""
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _update_quota(self, headers):
+        """Remember the quota reported by the API"""
+        with self._quota_lock:
+            try:
+                if 'x-requests-remaining' in headers:
+                    self.requests_remaining = int(float(headers['x-requests-remaining']))
+                    metrics.set('api_requests_remaining', self.requests_remaining)
+                if 'x-requests-used' in headers:
+                    self.requests_used = int(float(headers['x-requests-used']))
+                    metrics.set('api_requests_used', self.requests_used)
+            except ValueError:
+                logger.warning(f"Unexpected quota headers: {headers}")
+
+    def _log_usage(self, headers, cached=False):
+        """Log API usage next to cache statistics"""
+        requests_remaining = headers.get('x-requests-remaining', 'unknown')
+        requests_used = headers.get('x-requests-used', 'unknown')
+        source = " (cached)" if cached else ""
+        message = f"API usage{source} - Remaining requests: {requests_remaining}, Used requests: {requests_used}"
+
+        if self.cache is not None:
+            stats = self.cache.stats()
+            message += f", Cache hits: {stats['hits']}, Cache misses: {stats['misses']}"
+
+        logger.info(message)
+
+    def _request(self, path, params, description, **kwargs):
+        """
+        Send a rate limited GET request to the API
+
+        Returns:
+            requests.Response: The response, or None if the request failed (timeout, connection error, ...)
+        """
+        import requests
+
+        self.rate_limiter.acquire()
+        try:
+            return self.session.get(
+                f"{self.base_url}{path}",
+                params={'api_key': self.api_key, **params},
+                timeout=REQUEST_TIMEOUT,
+                **kwargs
+            )
+        except requests.RequestException as e:
+            logger.error(f"Failed to get {description}: {e}")
+            return None
+
+    def _get(self, path, params, description, log_usage=False, max_age=None):
+        """
+        Perform a GET request, serving it from the cache when a fresh entry exists
+
+        Args:
+            path (str): Path relative to the base URL
+            params (dict): Query parameters (without the API key)
+            description (str): What is being fetched, used in error messages
+            log_usage (bool): Whether to log quota usage for this request
+            max_age (float): Oldest cached response to accept in seconds, None for the cache TTL
+
+        Returns:
+            Parsed JSON response or None on failure
+        """
+        key = None
+
+        if self.cache is not None:
+            key = self.cache.make_key(f"{self.base_url}{path}", params)
+            entry = self.cache.get(key, max_age=max_age)
+            metrics.cache_lookup(entry is not None)
+
+            if entry is not None:
+                body, headers = entry
+                if log_usage:
+                    self._log_usage(headers, cached=True)
+                return json.loads(body)
+
+        if self.offline:
+            logger.warning(f"No cached {description} to use offline")
+            return None
+
+        response = self._request(path, params, description)
+        if response is None:
+            return None
+
         if response.status_code != 200:
-            logger.error(f"Failed to get sports: status_code {response.status_code}, response body {response.text}")
+            logger.error(f"Failed to get {description}: status_code {response.status_code}, response body {response.text}")
             return None
-            
+
+        headers = {name: response.headers[name] for name in QUOTA_HEADERS if name in response.headers}
+        self._update_quota(headers)
+
+        if key is not None:
+            self.cache.set(key, response.content, headers)
+
+        if log_usage:
+            self._log_usage(headers)
+
         return response.json()
-        
-    def get_odds(self, sport='baseball_mlb'):
-        """Get odds for a specific sport"""
-        url = f"{self.base_url}/sports/{sport}/odds"
-        
-        response = requests.get(
-            url,
-            params={
-                'api_key': self.api_key,
-                'regions': REGIONS,
-                'markets': MARKETS,
-                'oddsFormat': ODDS_FORMAT,
-                'dateFormat': DATE_FORMAT,
-            }
-        )
-        
+
+    def _get_stream(self, path, params, description, log_usage=False, max_age=None, chunk_size=65536):
+        """
+        Perform a GET request and return the body as an iterator of byte chunks
+
+        Like _get, but the body is never held in memory as a whole; on a cache
+        miss the chunks are written to the cache as they are consumed.
+
+        Returns:
+            iterator: Body chunks, or None on failure
+        """
+        key = None
+
+        if self.cache is not None:
+            key = self.cache.make_key(f"{self.base_url}{path}", params)
+            entry = self.cache.get_stream(key, max_age=max_age, chunk_size=chunk_size)
+            metrics.cache_lookup(entry is not None)
+
+            if entry is not None:
+                chunks, headers = entry
+                if log_usage:
+                    self._log_usage(headers, cached=True)
+                return chunks
+
+        if self.offline:
+            logger.warning(f"No cached {description} to use offline")
+            return None
+
+        response = self._request(path, params, description, stream=True)
+        if response is None:
+            return None
+
         if response.status_code != 200:
-            logger.error(f"Failed to get odds: status_code {response.status_code}, response body {response.text}")
-            return None
-            
-        # Log API usage
-        requests_remaining = response.headers.get('x-requests-remaining', 'unknown')
-        requests_used = response.headers.get('x-requests-used', 'unknown')
-        
-        logger.info(f"API usage - Remaining requests: {requests_remaining}, Used requests: {requests_used}")
-        
-        return response.json() 
\ No newline at end of file
+            logger.error(f"Failed to get {description}: status_code {response.status_code}, response body {response.text}")
+            response.close()
+            return None
+
+        headers = {name: response.headers[name] for name in QUOTA_HEADERS if name in response.headers}
+        self._update_quota(headers)
+
+        if log_usage:
+            self._log_usage(headers)
+
+        chunks = iter_response(response, chunk_size)
+        if key is not None:
+            chunks = self.cache.set_stream(key, chunks, headers)
+
+        return chunks
+
+    def get_sports(self):
+        """Get a list of available sports"""
+        return self._get("/sports", {}, "sports")
+
+    @staticmethod
+    def _odds_params(regions, markets, commence_from=None, commence_to=None):
+        """
+        Query parameters of an odds request
+
+        The commence time bounds are only sent when given, so unfiltered
+        requests keep their cache keys.
+        """
+        params = {
+            'regions': regions,
+            'markets': markets,
+            'oddsFormat': ODDS_FORMAT,
+            'dateFormat': DATE_FORMAT,
+        }
+
+        if commence_from is not None:
+            params['commenceTimeFrom'] = format_timestamp(commence_from)
+        if commence_to is not None:
+            params['commenceTimeTo'] = format_timestamp(commence_to)
+
+        return params
+
+    def get_odds(self, sport='baseball_mlb', regions=REGIONS, markets=MARKETS, max_age=None,
+                 commence_from=None, commence_to=None):
+        """Get odds for a specific sport, optionally only for games starting within [commence_from, commence_to]"""
+        params = self._odds_params(regions, markets, commence_from, commence_to)
+
+        return self._get(f"/sports/{sport}/odds", params, "odds", log_usage=True, max_age=max_age)
+
+    def _odds_stream(self, sport, regions, markets, max_age, commence_from=None, commence_to=None):
+        """Start streaming an odds response, returning None on failure"""
+        params = self._odds_params(regions, markets, commence_from, commence_to)
+
+        return self._get_stream(f"/sports/{sport}/odds", params, "odds", log_usage=True, max_age=max_age)
+
+    def iter_events(self, sport='baseball_mlb', regions=REGIONS, markets=MARKETS, max_age=None,
+                    commence_from=None, commence_to=None):
+        """
+        Stream raw odds events for a specific sport as the response arrives
+
+        Yields:
+            dict: One event in the API format
+        """
+        chunks = self._odds_stream(sport, regions, markets, max_age, commence_from, commence_to)
+        if chunks is None:
+            return
+
+        yield from iter_json_array(chunks)
+
+    def iter_odds(self, sport='baseball_mlb', regions=REGIONS, markets=MARKETS, max_age=None,
+                  commence_from=None, commence_to=None, event_filter=None):
+        """
+        Stream odds for a specific sport, yielding one GameOdds per event as the response arrives
+
+        Only one event is held as raw JSON at a time, so memory stays flat no
+        matter how many markets and regions are requested.
+
+        Args:
+            event_filter (callable): Optional predicate on the raw event dict; events
+                failing it are skipped before any model objects are built
+
+        Yields:
+            GameOdds: One object per event
+        """
+        for event in self.iter_events(sport, regions, markets, max_age, commence_from, commence_to):
+            if event_filter is None or event_filter(event):
+                yield GameOdds.from_api(event)
+
+    def _fetch_games(self, sport, regions, markets, max_age, commence_from=None, commence_to=None, event_filter=None):
+        """Fetch and parse one odds response, returning None on failure"""
+        import requests
+
+        with metrics.stage('fetch'):
+            chunks = self._odds_stream(sport, regions, markets, max_age, commence_from, commence_to)
+        if chunks is None:
+            return None
+
+        # The body is read while it is parsed, so a dropped connection or a
+        # truncated response only surfaces here
+        try:
+            if metrics.enabled:
+                return self._parse_games_timed(chunks, event_filter)
+
+            return [
+                GameOdds.from_api(event)
+                for event in iter_json_array(chunks)
+                if event_filter is None or event_filter(event)
+            ]
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Failed to read odds for {sport} in region {regions}: {e}")
+            return None
+
+    @staticmethod
+    def _parse_games_timed(chunks, event_filter):
+        """
+        _fetch_games' parsing with its time split between the decode and parse stages
+
+        Decoding is interleaved with reading the body, so the decode stage
+        includes waiting for the rest of the response.
+        """
+        games = []
+        parse_time = 0.0
+        start = time.perf_counter()
+
+        for event in iter_json_array(chunks):
+            if event_filter is None or event_filter(event):
+                parse_start = time.perf_counter()
+                games.append(GameOdds.from_api(event))
+                parse_time += time.perf_counter() - parse_start
+
+        metrics.observe('stage_seconds', time.perf_counter() - start - parse_time, stage='decode')
+        metrics.observe('stage_seconds', parse_time, stage='parse')
+        metrics.count_games(games)
+
+        return games
+
+    def get_odds_many(self, sports, regions, markets=MARKETS, max_workers=MAX_CONCURRENCY, max_age=None,
+                      commence_from=None, commence_to=None, event_filter=None):
+        """
+        Fetch odds for every sport/region combination concurrently
+
+        Requests run on a bounded thread pool and share the client's rate limiter.
+        Events returned by several regions are merged into one game holding the
+        bookmakers of every region.
+
+        Args:
+            sports (list): Sport keys
+            regions (list): Region keys (e.g. ['us', 'us2', 'eu', 'uk'])
+            markets (str): Comma separated market keys
+            max_workers (int): Maximum number of requests in flight
+            max_age (float): Oldest cached response to accept in seconds, None for the cache TTL
+            commence_from (datetime): Only games starting at or after this time (sent to the API)
+            commence_to (datetime): Only games starting at or before this time (sent to the API)
+            event_filter (callable): Optional predicate on raw event dicts, applied before parsing into GameOdds
+
+        Returns:
+            list: GameOdds objects, or None if every request failed
+        """
+        jobs = [(sport, region) for sport in sports for region in regions]
+
+        def fetch(job):
+            sport, region = job
+            return self._fetch_games(sport, region, markets, max_age, commence_from, commence_to, event_filter)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+            results = list(executor.map(fetch, jobs))
+
+        for (sport, region), data in zip(jobs, results):
+            if data is None:
+                logger.error(f"Failed to fetch odds for {sport} in region {region}")
+
+        if all(data is None for data in results):
+            return None
+
+        return merge_games(results)
+
+def merge_games(slates):
+    """
+    Merge game lists from several odds responses
+
+    Args:
+        slates (list): Lists of GameOdds objects, None entries are skipped
+
+    Returns:
+        list: One GameOdds per event id, with bookmakers combined and de-duplicated by key
+    """
+    games = {}
+
+    for slate in slates:
+        for game in slate or []:
+            merged = games.get(game.game_id)
+
+            if merged is None:
+                games[game.game_id] = game
+                continue
+
+            seen = {bookmaker.key for bookmaker in merged.bookmakers}
+            for bookmaker in game.bookmakers:
+                if bookmaker.key not in seen:
+                    merged.add_bookmaker(bookmaker)
+
+    return list(games.values())
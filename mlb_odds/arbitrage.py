@@ -0,0 +1,118 @@
+class ArbitrageCalculator:
+    """Arbitrage across every market, line and number of outcomes of a game"""
+
+    @staticmethod
+    def line_of(game, market, name, point):
+        """
+        The line an outcome belongs to
+
+        Spreads are keyed from the home team's side, so home -1.5 and away +1.5
+        share a line; totals share their point (Over 8.5 / Under 8.5); markets
+        without points (h2h) have a single line of None.
+        """
+        if point is None:
+            return None
+        if 'spreads' in market and name != game.home_team:
+            return -point
+        return point
+
+    @staticmethod
+    def is_complete(game, market, names):
+        """Check that a line has every outcome needed to cover all results"""
+        if market.endswith('totals'):
+            return {'Over', 'Under'} <= names
+        return {game.home_team, game.away_team} <= names
+
+    @staticmethod
+    def allocate_stakes(odds, bankroll=100):
+        """
+        Split a bankroll so every outcome pays out the same amount
+
+        Args:
+            odds (list): Decimal odds of each outcome
+            bankroll (float): Total amount to stake
+
+        Returns:
+            list: Stake on each outcome
+        """
+        implied_total = sum(1 / price for price in odds)
+        return [bankroll * (1 / price) / implied_total for price in odds]
+
+    @staticmethod
+    def group_lines(game):
+        """
+        Group a game's best prices by (market, line) in one pass over its outcome index
+
+        Returns:
+            dict: (market, line) -> {outcome name: (point, OutcomeQuotes)}
+        """
+        lines = {}
+
+        for (market, name, point), quotes in game.index.items():
+            line = ArbitrageCalculator.line_of(game, market, name, point)
+            lines.setdefault((market, line), {})[name] = (point, quotes)
+
+        return lines
+
+    @staticmethod
+    def find_arbitrage(games, bankroll=100, min_return=0.0):
+        """
+        Find arbitrage opportunities on every market and line of a collection of games
+
+        Args:
+            games (list): List of GameOdds objects
+            bankroll (float): Total stake used to size each opportunity
+            min_return (float): Minimum guaranteed return in percent
+
+        Returns:
+            list: Opportunities ranked by guaranteed return (highest first)
+        """
+        opportunities = []
+
+        for game in games:
+            for (market, line), outcomes in ArbitrageCalculator.group_lines(game).items():
+                if not ArbitrageCalculator.is_complete(game, market, set(outcomes)):
+                    continue
+
+                legs = [(name, point, quotes) for name, (point, quotes) in outcomes.items()]
+                if any(quotes.best_odds <= 1 for _, _, quotes in legs):
+                    continue
+
+                implied_total = sum(1 / quotes.best_odds for _, _, quotes in legs)
+                return_pct = (1 / implied_total - 1) * 100
+
+                if implied_total >= 1 or return_pct < min_return:
+                    continue
+
+                stakes = ArbitrageCalculator.allocate_stakes([quotes.best_odds for _, _, quotes in legs], bankroll)
+                outcome_rows = []
+
+                for (name, point, quotes), stake in zip(legs, stakes):
+                    stake = round(stake, 2)
+                    outcome_rows.append({
+                        'name': name,
+                        'point': point,
+                        'odds': quotes.best_odds,
+                        'bookmaker': quotes.best_bookmaker,
+                        'stake': stake,
+                        'payout': round(stake * quotes.best_odds, 2)
+                    })
+
+                total_staked = round(sum(row['stake'] for row in outcome_rows), 2)
+
+                opportunities.append({
+                    'game': str(game),
+                    'game_id': game.game_id,
+                    'market': market,
+                    'line': line,
+                    'outcomes': outcome_rows,
+                    'implied_probability': implied_total,
+                    'return_pct': round(return_pct, 2),
+                    'total_stake': total_staked,
+                    'guaranteed_profit': round(min(row['payout'] for row in outcome_rows) - total_staked, 2)
+                })
+
+        # Rank by guaranteed return (highest first)
+        opportunities.sort(key=lambda x: x['return_pct'], reverse=True)
+
+        return opportunities
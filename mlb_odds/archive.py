@@ -0,0 +1,368 @@
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime, timezone
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: one writer per archive
+    fcntl = None
+from .config import ARCHIVE_DIR
+from .models import GameOdds, Bookmaker, Market, Outcome
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width record per price; strings are ids into the archive's string table
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<i8'),  # snapshot time, microseconds since the epoch (UTC)
+    ('commence_time', '<i8'),  # microseconds since the epoch (UTC)
+    ('game', '<u4'),
+    ('sport', '<u4'),
+    ('home_team', '<u4'),
+    ('away_team', '<u4'),
+    ('bookmaker', '<u4'),
+    ('bookmaker_title', '<u4'),
+    ('market', '<u4'),
+    ('outcome', '<u4'),
+    ('point', '<f8'),  # NaN when the outcome has no point
+    ('price', '<f8'),
+])
+
+# Block header: magic, flags, record count, payload size in bytes, padded to 24 bytes
+BLOCK_HEADER = struct.Struct('<4sB3xIQ4x')
+BLOCK_MAGIC = b'ODB2'
+COMPRESSED = 0x1
+
+# Payloads are padded so every block (and uncompressed record array) starts 8-byte aligned
+ALIGNMENT = 8
+
+STRINGS_FILE = 'strings.jsonl'
+DAY_SUFFIX = '.odds'
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def to_micros(value):
+    """Microseconds since the epoch of a datetime (naive values are UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+def from_micros(value):
+    """UTC datetime of a microsecond timestamp"""
+    return datetime.fromtimestamp(int(value) / 1000000, tz=timezone.utc)
+
+class StringTable:
+    """
+    Append-only table of the strings referenced by records
+
+    Strings are stored one JSON string per line; a string's id is its line
+    number, so ids never change once written. New strings are appended under
+    an exclusive lock on the file, after catching up with what other writers
+    appended, so concurrent writers never give one id to two strings.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.strings = []
+        self._ids = {}
+        self._file = None
+        self._offset = 0  # bytes of the file already loaded
+        self.reload()
+
+    def reload(self):
+        """Pick up strings appended since the table was loaded"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partially written line
+                value = json.loads(line)
+                self._ids[value] = len(self.strings)
+                self.strings.append(value)
+                self._offset += len(line)
+
+    def get_id(self, value):
+        """Id of a string already in the table, or None"""
+        return self._ids.get(value)
+
+    def add(self, value):
+        """Id of a string, appending it to the table if it is new"""
+        string_id = self._ids.get(value)
+        if string_id is not None:
+            return string_id
+
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            self.reload()
+            string_id = self._ids.get(value)
+            if string_id is None:
+                line = (json.dumps(value) + '\n').encode('utf-8')
+                self._file.write(line)
+                self._file.flush()
+                string_id = self._ids[value] = len(self.strings)
+                self.strings.append(value)
+                self._offset += len(line)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+        return string_id
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __getitem__(self, string_id):
+        return self.strings[string_id]
+
+class ArchiveWriter:
+    """Appends GameOdds snapshots to per-day block files"""
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, compress=True, level=6):
+        """
+        Args:
+            archive_dir (str): Directory holding the day files and string table
+            compress (bool): zlib compress each block; uncompressed blocks can be
+                memory-mapped without copying
+            level (int): zlib compression level
+        """
+        self.archive_dir = archive_dir
+        self.compress = compress
+        self.level = level
+        os.makedirs(archive_dir, exist_ok=True)
+        self.strings = StringTable(os.path.join(archive_dir, STRINGS_FILE))
+
+    def close(self):
+        self.strings.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def records(self, games, timestamp):
+        """Pack every price of a snapshot into a record array"""
+        add = self.strings.add
+        snapshot_time = to_micros(timestamp)
+        rows = []
+
+        for game in games:
+            game_fields = (
+                snapshot_time,
+                to_micros(game.commence_time),
+                add(game.game_id),
+                add(game.sport),
+                add(game.home_team),
+                add(game.away_team),
+            )
+            for bookmaker in game.bookmakers:
+                bookmaker_fields = (add(bookmaker.key), add(bookmaker.title))
+                for market in bookmaker.markets:
+                    market_id = add(market.market_type)
+                    for outcome in market.outcomes:
+                        rows.append(game_fields + bookmaker_fields + (
+                            market_id,
+                            add(outcome.name),
+                            np.nan if outcome.point is None else outcome.point,
+                            outcome.price,
+                        ))
+
+        return np.array(rows, dtype=RECORD_DTYPE)
+
+    def append(self, games, timestamp=None):
+        """
+        Append one snapshot as a block of the day file it belongs to
+
+        Args:
+            games (list): GameOdds objects
+            timestamp (datetime): Snapshot time, now if None
+
+        Returns:
+            int: Number of records written
+        """
+        timestamp = timestamp or datetime.now(timezone.utc)
+        records = self.records(games, timestamp)
+        if not len(records):
+            return 0
+
+        payload = records.tobytes()
+        flags = 0
+        if self.compress:
+            payload = zlib.compress(payload, self.level)
+            flags |= COMPRESSED
+
+        padding = -len(payload) % ALIGNMENT
+        block = BLOCK_HEADER.pack(BLOCK_MAGIC, flags, len(records), len(payload)) + payload + b'\0' * padding
+
+        # Strings must be durable before any block that refers to them
+        self.strings.flush()
+
+        day = timestamp.astimezone(timezone.utc) if timestamp.tzinfo else timestamp
+        path = os.path.join(self.archive_dir, day.strftime('%Y-%m-%d') + DAY_SUFFIX)
+        with open(path, 'ab') as f:
+            f.write(block)
+
+        logger.info(f"Archived {len(records)} prices ({len(block)} bytes) to {path}")
+        return len(records)
+
+class ArchiveReader:
+    """
+    Memory-mapped reader for an odds archive
+
+    Uncompressed blocks are returned as NumPy views straight into the mapped
+    file; compressed blocks are inflated into a new array. Views stay valid
+    until the reader is closed.
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.strings = StringTable(os.path.join(archive_dir, STRINGS_FILE))
+        self._maps = {}
+
+    def close(self):
+        for mapped in self._maps.values():
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # still referenced by a view; released with it
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def days(self):
+        """Archived days (YYYY-MM-DD), oldest first"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(name[:-len(DAY_SUFFIX)] for name in os.listdir(self.archive_dir) if name.endswith(DAY_SUFFIX))
+
+    def _map(self, day):
+        path = os.path.join(self.archive_dir, day + DAY_SUFFIX)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        mapped = self._maps.get(day)
+
+        # Remap when a writer has appended since; views of the old map stay valid
+        if mapped is None or len(mapped) < size:
+            if size == 0:
+                return None
+            with open(path, 'rb') as f:
+                mapped = self._maps[day] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped
+
+    def blocks(self, day):
+        """
+        Iterate over the record arrays of a day, one per archived snapshot
+
+        A block cut short by an interrupted write ends the iteration.
+        """
+        mapped = self._map(day)
+        if mapped is None:
+            return
+
+        offset = 0
+        size = len(mapped)
+
+        while offset + BLOCK_HEADER.size <= size:
+            magic, flags, count, payload_size = BLOCK_HEADER.unpack_from(mapped, offset)
+            start = offset + BLOCK_HEADER.size
+            end = start + payload_size
+
+            if magic != BLOCK_MAGIC or end > size:
+                logger.warning(f"Ignoring truncated archive block in {day} at byte {offset}")
+                return
+
+            if flags & COMPRESSED:
+                records = np.frombuffer(zlib.decompress(mapped[start:end]), dtype=RECORD_DTYPE, count=count)
+            else:
+                records = np.frombuffer(mapped, dtype=RECORD_DTYPE, count=count, offset=start)
+
+            yield records
+            offset = end + (-payload_size % ALIGNMENT)
+
+    def records(self, since=None, until=None):
+        """
+        Every record archived on the given days as one array
+
+        Args:
+            since (str): First day (YYYY-MM-DD), None for the first archived day
+            until (str): Last day (YYYY-MM-DD), None for the last archived day
+
+        Returns:
+            ndarray: Records of RECORD_DTYPE in archive order
+        """
+        days = [day for day in self.days() if (since is None or day >= since) and (until is None or day <= until)]
+        blocks = [records for day in days for records in self.blocks(day)]
+        return np.concatenate(blocks) if blocks else np.empty(0, dtype=RECORD_DTYPE)
+
+    def string_id(self, value):
+        """Id of a team, bookmaker, market or outcome name, for filtering records; None if never archived"""
+        self.strings.reload()
+        return self.strings.get_id(value)
+
+    def decode(self, ids):
+        """Strings of an array of string ids"""
+        self.strings.reload()
+        table = np.array(self.strings.strings, dtype=object)
+        return table[np.asarray(ids, dtype=np.intp)]
+
+    def to_games(self, records):
+        """
+        Rebuild GameOdds from the records of one snapshot
+
+        Args:
+            records (ndarray): Records of RECORD_DTYPE, e.g. one block
+
+        Returns:
+            list: GameOdds in the order the games were archived
+        """
+        self.strings.reload()
+        strings = self.strings
+        games = {}
+        bookmakers = {}
+        markets = {}
+
+        for record in records.tolist():
+            timestamp, commence_time, game_id, sport, home, away, book, title, market_type, outcome, point, price = record
+
+            game = games.get(game_id)
+            if game is None:
+                game = games[game_id] = GameOdds(
+                    strings[game_id], strings[sport], from_micros(commence_time), strings[home], strings[away]
+                )
+
+            bookmaker = bookmakers.get((game_id, book))
+            if bookmaker is None:
+                bookmaker = bookmakers[(game_id, book)] = Bookmaker(strings[book], strings[title], from_micros(timestamp))
+                game.bookmakers.append(bookmaker)
+
+            market = markets.get((game_id, book, market_type))
+            if market is None:
+                market = markets[(game_id, book, market_type)] = Market(strings[market_type])
+                bookmaker.markets.append(market)
+
+            market.outcomes.append(Outcome(strings[outcome], price, None if math.isnan(point) else point))
+
+        return list(games.values())
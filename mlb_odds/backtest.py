@@ -0,0 +1,476 @@
+import argparse
+import itertools
+import logging
+import math
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from tabulate import tabulate
+from .arbitrage import ArbitrageCalculator
+from .batch import BatchEVCalculator, TwoWayPrices
+from .config import DB_PATH
+from .devig import METHODS as DEVIG_METHODS
+from .models import intern_name
+from .storage import OddsStore, build_game
+
+logger = logging.getLogger(__name__)
+
+# Days downsampled by OddsStore.compact() have no snapshots left; each of their
+# daily rows is replayed as its open, posted at first_seen and live until
+# last_seen, replaced by its close at last_seen
+SNAPSHOT_TIMES_QUERY = """
+SELECT timestamp FROM snapshots WHERE timestamp >= ? AND timestamp < ?
+UNION
+SELECT first_seen FROM price_daily WHERE day = ?
+UNION
+SELECT last_seen FROM price_daily WHERE day = ? AND last_seen < ?
+ORDER BY 1
+"""
+
+# Compacted runs that started before a day and are still live during it
+SEED_QUERY = """
+SELECT timestamp, game_id, bookmaker, market, outcome, point, price, last_seen FROM price_history
+WHERE last_seen >= ? AND timestamp < ?
+"""
+
+# Prices posted during a day in snapshot order; served by idx_price_history_timestamp
+# and idx_price_daily_day
+PRICES_QUERY = """
+SELECT timestamp, game_id, bookmaker, market, outcome, point, price, COALESCE(last_seen, timestamp)
+FROM price_history
+WHERE timestamp >= ? AND timestamp < ?
+UNION ALL
+SELECT first_seen, game_id, bookmaker, market, outcome, point, open, last_seen FROM price_daily
+WHERE day = ?
+UNION ALL
+SELECT last_seen, game_id, bookmaker, market, outcome, point, close, last_seen FROM price_daily
+WHERE day = ? AND last_seen > first_seen AND last_seen < ?
+ORDER BY timestamp
+"""
+
+# Downsampled days are split at first pitch, so pre-game daily rows start before it
+CLOSING_TIMESTAMP_QUERY = """
+SELECT MAX(closed_at) FROM (
+    SELECT MAX(COALESCE(last_seen, timestamp)) AS closed_at FROM price_history WHERE game_id = ? AND timestamp < ?
+    UNION ALL
+    SELECT MAX(last_seen) FROM price_daily WHERE game_id = ? AND first_seen < ?
+)
+"""
+
+# Every price live at a snapshot, whether posted then, carried by a compacted run
+# or closing a downsampled day
+CLOSING_QUERY = """
+SELECT bookmaker, market, outcome, point, price FROM (
+    SELECT bookmaker, market, outcome, point, price FROM price_history
+    WHERE game_id = ? AND timestamp <= ? AND COALESCE(last_seen, timestamp) >= ?
+    UNION ALL
+    SELECT bookmaker, market, outcome, point, close FROM price_daily
+    WHERE game_id = ? AND first_seen <= ? AND last_seen >= ?
+)
+ORDER BY bookmaker, market, outcome, point
+"""
+
+# Closing lines per game, memoized per worker process
+_closing_lines = {}
+
+def connect_readonly(db_path):
+    """Open the database read-only so workers never block the poller's writes"""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+def load_metadata(connection):
+    """Games (with commence time as stored and parsed) and bookmaker titles"""
+    games = {}
+    for game_id, sport, home, away, commence_time in connection.execute(
+        "SELECT game_id, sport, home_team, away_team, commence_time FROM games"
+    ):
+        parsed = datetime.strptime(commence_time, '%Y-%m-%d %H:%M:%S.%f')
+        games[game_id] = (commence_time, (game_id, intern_name(sport), intern_name(home), intern_name(away), parsed))
+
+    titles = {key: intern_name(title) for key, title in connection.execute("SELECT key, title FROM bookmakers")}
+    return games, titles
+
+def price_order(key):
+    """Sort key grouping prices by game, bookmaker and market as build_game expects"""
+    game_id, bookmaker, market, outcome, point = key
+    return game_id, bookmaker, market, outcome, point is None, point or 0
+
+def iter_snapshots(connection, games, titles, start, end):
+    """
+    Stream the pre-game slates of every snapshot of one day, from start to end
+
+    Prices are read from the cursor as the replay reaches them and kept
+    only while live, so memory holds a single slate however many days are
+    replayed. Prices from compacted runs stay live until their last_seen.
+
+    Yields:
+        tuple: (timestamp string, list of GameOdds not yet started at that time)
+    """
+    live = {}  # (game_id, bookmaker, market, outcome, point) -> (price, last seen)
+    for _, game_id, book, market, outcome, point, price, last_seen in connection.execute(SEED_QUERY, (start, start)):
+        live[(game_id, book, market, outcome, point)] = (price, last_seen)
+
+    day = start[:10]
+    rows = connection.execute(PRICES_QUERY, (start, end, day, day, end))
+    pending = next(rows, None)
+    ordered = None
+
+    for (timestamp,) in connection.execute(SNAPSHOT_TIMES_QUERY, (start, end, day, day, end)).fetchall():
+        while pending is not None and pending[0] <= timestamp:
+            _, game_id, book, market, outcome, point, price, last_seen = pending
+            key = (game_id, book, market, outcome, point)
+            if key not in live:
+                ordered = None
+            live[key] = (price, last_seen)
+            pending = next(rows, None)
+
+        expired = [key for key, (_, last_seen) in live.items() if last_seen < timestamp]
+        if expired:
+            for key in expired:
+                del live[key]
+            ordered = None
+
+        if ordered is None:
+            ordered = sorted(live, key=price_order)
+
+        last_update = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S.%f')
+        slate = []
+
+        for game_id, keys in itertools.groupby(ordered, key=lambda key: key[0]):
+            commence_time, game = games.get(game_id, (None, None))
+            if game is None or timestamp >= commence_time:
+                continue
+            game_rows = (key[1:] + (live[key][0],) for key in keys)
+            slate.append(build_game(game, titles, game_rows, last_update))
+
+        if slate:
+            yield timestamp, slate
+
+def closing_line(connection, games, titles, game_id, devig_methods):
+    """
+    Closing prices and de-vigged closing probabilities of a game's h2h market
+
+    The closing line is the game's last stored snapshot before it started.
+
+    Returns:
+        dict: 'prices' maps (team, bookmaker title) to the closing price and
+            'fair' maps (devig method, team) to the closing consensus probability;
+            None if the game was never stored before it started
+    """
+    if game_id in _closing_lines:
+        return _closing_lines[game_id]
+
+    commence_time, game = games[game_id]
+    closed_at = connection.execute(CLOSING_TIMESTAMP_QUERY, (game_id, commence_time) * 2).fetchone()[0]
+    closing = None
+
+    if closed_at is not None:
+        rows = connection.execute(CLOSING_QUERY, (game_id, closed_at, closed_at) * 2).fetchall()
+        closing_game = build_game(game, titles, rows, game[4])
+        prices = TwoWayPrices.from_games([closing_game])
+        teams = (closing_game.home_team, closing_game.away_team)
+
+        closing = {'prices': {}, 'fair': {}}
+        for team in teams:
+            quotes = closing_game.get_quotes(team)
+            for bookmaker, price in quotes.quotes if quotes else []:
+                closing['prices'][(team, bookmaker.title)] = price
+
+        for method in devig_methods:
+            for team, probability in zip(teams, prices.consensus_probabilities(method)[0]):
+                if not math.isnan(probability):
+                    closing['fair'][(method, team)] = float(probability)
+
+    _closing_lines[game_id] = closing
+    return closing
+
+def score_bet(bet, closing, devig):
+    """Closing line value and expected ROI of a value bet against its game's closing line"""
+    fair = closing['fair'].get((devig, bet['team'])) if closing else None
+    closing_price = closing['prices'].get((bet['team'], bet['bookmaker'])) if closing else None
+
+    return {
+        'edge': bet['edge'],
+        'expected_value': bet['expected_value'],
+        # Price taken vs the same bookmaker's closing price
+        'clv': (bet['odds'] / closing_price - 1) * 100 if closing_price else None,
+        # Return of a unit stake if the closing consensus is the true probability
+        'roi': (bet['odds'] * fair - 1) * 100 if fair is not None else None,
+    }
+
+def backtest_day(db_path, day, value_configs, min_returns, bankroll):
+    """
+    Replay one day of snapshots
+
+    Each opportunity counts once per configuration, the first time it is
+    flagged; the caller keeps the earliest across days.
+
+    Args:
+        db_path (str): SQLite database with price_history
+        day (str): UTC day as YYYY-MM-DD
+        value_configs (list): (min_odds, max_odds, devig, min_edge) tuples
+        min_returns (list): Arbitrage return thresholds in percent
+        bankroll (float): Total stake of each arbitrage
+
+    Returns:
+        tuple: (value bets, arbitrage opportunities), each a dict of
+            key -> (timestamp, scored opportunity)
+    """
+    start = f"{day} 00:00:00.000000"
+    end = (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d 00:00:00.000000')
+
+    devig_methods = sorted({config[2] for config in value_configs})
+    # The widest odds range per method: narrower configurations filter its bets
+    ranges = {
+        method: (
+            min(config[0] for config in value_configs if config[2] == method),
+            max(config[1] for config in value_configs if config[2] == method),
+        )
+        for method in devig_methods
+    }
+
+    value = {}
+    arbitrage = {}
+    connection = connect_readonly(db_path)
+
+    try:
+        games, titles = load_metadata(connection)
+
+        for timestamp, slate in iter_snapshots(connection, games, titles, start, end):
+            prices = TwoWayPrices.from_games(slate)
+            game_ids = {str(game): game.game_id for game in slate}
+
+            for method in devig_methods:
+                min_odds, max_odds = ranges[method]
+                for bet in BatchEVCalculator.find_best_value_bets(prices, min_odds, max_odds, method):
+                    game_id = game_ids[bet['game']]
+                    scored = None
+
+                    for config in value_configs:
+                        config_min_odds, config_max_odds, config_devig, min_edge = config
+                        if config_devig != method or bet['edge'] < min_edge:
+                            continue
+                        if bet['odds'] < config_min_odds or bet['odds'] > config_max_odds:
+                            continue
+
+                        key = (config, game_id, bet['team'], bet['bookmaker'])
+                        if key in value:
+                            continue
+
+                        if scored is None:
+                            closing = closing_line(connection, games, titles, game_id, devig_methods)
+                            scored = score_bet(bet, closing, method)
+                        value[key] = (timestamp, scored)
+
+            if min_returns:
+                for opportunity in ArbitrageCalculator.find_arbitrage(slate, bankroll, min(min_returns)):
+                    for min_return in min_returns:
+                        if opportunity['return_pct'] < min_return:
+                            continue
+                        key = (min_return, opportunity['game_id'], opportunity['market'], opportunity['line'])
+                        if key not in arbitrage:
+                            arbitrage[key] = (timestamp, {
+                                'return_pct': opportunity['return_pct'],
+                                'guaranteed_profit': opportunity['guaranteed_profit'],
+                            })
+    finally:
+        connection.close()
+
+    return value, arbitrage
+
+def merge_earliest(target, results):
+    """Keep the earliest occurrence of every key"""
+    for key, (timestamp, scored) in results.items():
+        current = target.get(key)
+        if current is None or timestamp < current[0]:
+            target[key] = (timestamp, scored)
+
+def average(values):
+    values = [value for value in values if value is not None]
+    return round(sum(values) / len(values), 2) if values else None
+
+def summarize(value, arbitrage, value_configs, min_returns):
+    """Aggregate the first-trigger opportunities into one report row per configuration"""
+    bets_by_config = {config: [] for config in value_configs}
+    for (config, *_), (_, scored) in value.items():
+        bets_by_config[config].append(scored)
+
+    value_report = []
+    for config, bets in bets_by_config.items():
+        min_odds, max_odds, devig, min_edge = config
+        beat = [bet['clv'] > 0 for bet in bets if bet['clv'] is not None]
+
+        value_report.append({
+            'min_odds': min_odds,
+            'max_odds': max_odds,
+            'devig': devig,
+            'min_edge': min_edge,
+            'bets': len(bets),
+            'avg_edge': average(bet['edge'] for bet in bets),
+            'avg_ev': average(bet['expected_value'] for bet in bets),
+            'avg_clv': average(bet['clv'] for bet in bets),
+            'beat_close_pct': round(sum(beat) / len(beat) * 100, 2) if beat else None,
+            'expected_roi': average(bet['roi'] for bet in bets),
+        })
+
+    arbitrage_by_threshold = {min_return: [] for min_return in min_returns}
+    for (min_return, *_), (_, scored) in arbitrage.items():
+        arbitrage_by_threshold[min_return].append(scored)
+
+    arbitrage_report = [
+        {
+            'min_return': min_return,
+            'opportunities': len(opportunities),
+            'avg_return': average(opp['return_pct'] for opp in opportunities),
+            'total_profit': round(sum(opp['guaranteed_profit'] for opp in opportunities), 2),
+        }
+        for min_return, opportunities in arbitrage_by_threshold.items()
+    ]
+
+    return {'value': value_report, 'arbitrage': arbitrage_report}
+
+def stored_days(db_path, since=None, until=None):
+    """UTC days with stored snapshots, optionally limited to [since, until]"""
+    connection = connect_readonly(db_path)
+    try:
+        first, last = connection.execute(
+            "SELECT MIN(first), MAX(last) FROM ("
+            "SELECT MIN(timestamp) AS first, MAX(timestamp) AS last FROM price_history "
+            "UNION ALL "
+            "SELECT MIN(day), MAX(day) FROM price_daily"
+            ")"
+        ).fetchone()
+    finally:
+        connection.close()
+
+    if first is None:
+        return []
+
+    day = datetime.strptime(first[:10], '%Y-%m-%d').date()
+    last_day = datetime.strptime(last[:10], '%Y-%m-%d').date()
+    if since:
+        day = max(day, since)
+    if until:
+        last_day = min(last_day, until)
+
+    days = []
+    while day <= last_day:
+        days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+def run_backtest(db_path=DB_PATH, min_odds=(1.5,), max_odds=(10.0,), devig=('multiplicative',),
+                 min_edge=(0.0,), min_return=(0.0,), bankroll=100, since=None, until=None, max_workers=None):
+    """
+    Replay stored snapshots over a grid of settings and score them against closing lines
+
+    Days are processed in parallel, each worker streaming its day's
+    snapshots from the database.
+
+    Args:
+        db_path (str): SQLite database written with --store
+        min_odds (list): Minimum odds values to try
+        max_odds (list): Maximum odds values to try
+        devig (list): De-vig methods to try
+        min_edge (list): Minimum value bet edges (percent) to try
+        min_return (list): Minimum arbitrage returns (percent) to try
+        bankroll (float): Total stake of each arbitrage
+        since (date): First day to replay, None for the first stored day
+        until (date): Last day to replay, None for the last stored day
+        max_workers (int): Worker processes, None for one per CPU
+
+    Returns:
+        dict: 'value' and 'arbitrage' report rows, one per configuration
+    """
+    # Bring the schema up to date before the read-only workers open it
+    OddsStore(db_path).close()
+
+    value_configs = list(itertools.product(min_odds, max_odds, devig, min_edge))
+    min_returns = list(min_return)
+    days = stored_days(db_path, since, until)
+
+    value = {}
+    arbitrage = {}
+
+    logger.info(f"Backtesting {len(days)} days over {len(value_configs)} value and {len(min_returns)} arbitrage settings")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(backtest_day, db_path, day, value_configs, min_returns, bankroll)
+            for day in days
+        ]
+        for future in futures:
+            day_value, day_arbitrage = future.result()
+            merge_earliest(value, day_value)
+            merge_earliest(arbitrage, day_arbitrage)
+
+    return summarize(value, arbitrage, value_configs, min_returns)
+
+def display_report(report):
+    """Display the backtest report tables"""
+    print("\nValue Bets (first trigger per game, team and bookmaker):")
+    print(tabulate(
+        [
+            [row['min_odds'], row['max_odds'], row['devig'], row['min_edge'], row['bets'], row['avg_edge'],
+             row['avg_ev'], row['avg_clv'], row['beat_close_pct'], row['expected_roi']]
+            for row in report['value']
+        ],
+        headers=["Min Odds", "Max Odds", "De-vig", "Min Edge %", "Bets", "Avg Edge %",
+                 "Avg EV ($100)", "Avg CLV %", "Beat Close %", "Expected ROI %"],
+        tablefmt="grid"
+    ))
+
+    print("\nArbitrage (first trigger per game, market and line):")
+    print(tabulate(
+        [
+            [row['min_return'], row['opportunities'], row['avg_return'], row['total_profit']]
+            for row in report['arbitrage']
+        ],
+        headers=["Min Return %", "Opportunities", "Avg Return %", "Total Profit"],
+        tablefmt="grid"
+    ))
+
+def parse_day(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date {value!r}. Please use YYYY-MM-DD")
+
+def main():
+    """Main entry point for the backtester"""
+    parser = argparse.ArgumentParser(description="Backtest value bets and arbitrage on stored odds snapshots")
+    parser.add_argument("--db", type=str, default=DB_PATH, help=f"Database written with --store (default: {DB_PATH})")
+    parser.add_argument("--min-odds", type=float, nargs="+", default=[1.5], help="Minimum odds values to try")
+    parser.add_argument("--max-odds", type=float, nargs="+", default=[10.0], help="Maximum odds values to try")
+    parser.add_argument("--devig", choices=DEVIG_METHODS, nargs="+", default=['multiplicative'], help="De-vig methods to try")
+    parser.add_argument("--min-edge", type=float, nargs="+", default=[0.0], help="Minimum value bet edges in percent to try")
+    parser.add_argument("--min-return", type=float, nargs="+", default=[0.0], help="Minimum arbitrage returns in percent to try")
+    parser.add_argument("--bankroll", type=float, default=100, help="Total stake of each arbitrage (default: 100)")
+    parser.add_argument("--since", type=parse_day, help="First day to replay (YYYY-MM-DD)")
+    parser.add_argument("--until", type=parse_day, help="Last day to replay (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    report = run_backtest(
+        args.db,
+        min_odds=args.min_odds,
+        max_odds=args.max_odds,
+        devig=args.devig,
+        min_edge=args.min_edge,
+        min_return=args.min_return,
+        bankroll=args.bankroll,
+        since=args.since,
+        until=args.until,
+        max_workers=args.workers
+    )
+    display_report(report)
+
+if __name__ == "__main__":
+    main()
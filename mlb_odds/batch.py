@@ -0,0 +1,174 @@
+import numpy as np
+from .devig import default_cache
+
+HOME = 0
+AWAY = 1
+
+class TwoWayPrices:
+    """
+    Home and away prices for a whole slate packed into padded NumPy arrays
+
+    odds has shape (games, 2, bookmakers) with the home side at index 0 and the
+    away side at index 1. Bookmakers keep the order of GameOdds.get_all_odds and
+    unused slots are NaN, so a game's prices can be processed as one row.
+    """
+
+    def __init__(self, games, odds, entries):
+        self.games = games
+        self.odds = odds
+        self.entries = entries  # entries[game][side] is the list of (Bookmaker, price) behind each row
+
+    @classmethod
+    def from_games(cls, games, market='h2h'):
+        """
+        Pack the two-way prices of a list of games
+
+        Args:
+            games (list): GameOdds objects
+            market (str): Market to read prices from
+
+        Returns:
+            TwoWayPrices: Packed prices
+        """
+        entries = [(cls._quotes(game, game.home_team, market), cls._quotes(game, game.away_team, market)) for game in games]
+        width = max((len(side) for pair in entries for side in pair), default=0)
+
+        odds = np.full((len(games), 2, width), np.nan)
+        for i, pair in enumerate(entries):
+            for side, quotes in enumerate(pair):
+                if quotes:
+                    odds[i, side, :len(quotes)] = [price for _, price in quotes]
+
+        return cls(games, odds, entries)
+
+    @staticmethod
+    def _quotes(game, team, market):
+        quotes = game.get_quotes(team, market)
+        return quotes.quotes if quotes is not None else []
+
+    @property
+    def valid(self):
+        """Mask of slots that hold a price"""
+        return ~np.isnan(self.odds)
+
+    @property
+    def counts(self):
+        """Number of prices per game and side"""
+        return self.valid.sum(axis=2)
+
+    def implied_probabilities(self):
+        """1/odds for every price, 0 in unused slots"""
+        return np.divide(1.0, self.odds, out=np.zeros_like(self.odds), where=self.valid)
+
+    def consensus_probabilities(self, devig='multiplicative'):
+        """
+        Market consensus probability of each side
+
+        Implied probabilities are averaged per side and the margin is removed
+        with the chosen de-vig method, as in EVCalculator.find_best_value_bets.
+        The sums are accumulated left to right so results are bit-for-bit
+        identical; power and Shin vectors are solved in one batch and memoized.
+
+        Args:
+            devig (str): One of devig.METHODS
+
+        Returns:
+            ndarray: Shape (games, 2); rows for games missing a side are NaN
+        """
+        counts = self.counts
+        implied = self.implied_probabilities()
+
+        if implied.shape[2] == 0:
+            return np.full(counts.shape, np.nan)
+
+        # cumsum adds strictly in order, matching Python's sum()
+        totals = np.cumsum(implied, axis=2)[:, :, -1]
+
+        missing = (counts == 0).any(axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            average = totals / counts
+
+            if devig == 'multiplicative':
+                consensus = average / average.sum(axis=1, keepdims=True)
+            else:
+                consensus = np.full(average.shape, np.nan)
+                if not missing.all():
+                    consensus[~missing] = default_cache.fair_probabilities(average[~missing], devig)
+
+        consensus[missing] = np.nan
+        return consensus
+
+class BatchEVCalculator:
+    """Vectorized counterparts of the EVCalculator slate scans"""
+
+    @staticmethod
+    def expected_values(win_probability, odds_decimal, bet_amount=100):
+        """Unrounded EVCalculator.calculate_ev over arrays"""
+        win_amount = (odds_decimal - 1) * bet_amount
+        lose_amount = -bet_amount
+
+        return (win_probability * win_amount) + ((1 - win_probability) * lose_amount)
+
+    @staticmethod
+    def find_best_value_bets(games, min_odds=1.5, max_odds=10.0, devig='multiplicative'):
+        """
+        Find bets with positive expected value using market consensus as "true" probability
+
+        Computes consensus probabilities and EV for every (game, side, bookmaker)
+        at once and returns exactly what EVCalculator.find_best_value_bets does.
+
+        Args:
+            games (list or TwoWayPrices): GameOdds objects, or prices already packed
+            min_odds (float): Minimum odds to consider
+            max_odds (float): Maximum odds to consider
+            devig (str): How the margin is removed from the consensus (see devig.METHODS)
+
+        Returns:
+            list: List of value bets ranked by EV
+        """
+        prices = games if isinstance(games, TwoWayPrices) else TwoWayPrices.from_games(games)
+        odds = prices.odds
+
+        consensus = prices.consensus_probabilities(devig)[:, :, np.newaxis]
+
+        with np.errstate(invalid='ignore'):
+            ev = BatchEVCalculator.expected_values(consensus, odds)
+            candidates = (odds >= min_odds) & (odds <= max_odds) & (ev > 0)
+
+        value_bets = []
+        labels = {}
+
+        # nonzero walks games, then home before away, then bookmakers: the original order
+        for i, side, j in zip(*(index.tolist() for index in np.nonzero(candidates))):
+            game = prices.games[i]
+            if i not in labels:
+                labels[i] = str(game)
+            bookmaker, price = prices.entries[i][side][j]
+            true_prob = float(consensus[i, side, 0])
+
+            # Round like EVCalculator.calculate_ev; bets rounding to $0.00 are not positive
+            expected_value = round(float(ev[i, side, j]), 2)
+            if expected_value <= 0:
+                continue
+
+            implied_prob = 1 / price
+            edge = (true_prob - implied_prob) * 100  # Edge percentage
+            is_home = side == HOME
+
+            value_bets.append({
+                'game': labels[i],
+                'team': game.home_team if is_home else game.away_team,
+                'is_home': is_home,
+                'odds': price,
+                'bookmaker': bookmaker.title,
+                'implied_probability': implied_prob,
+                'consensus_probability': true_prob,
+                'edge': round(edge, 2),
+                'expected_value': expected_value
+            })
+
+        # Rank by expected value (highest first)
+        value_bets.sort(key=lambda x: x['expected_value'], reverse=True)
+
+        return value_bets
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from .config import CACHE_DIR, CACHE_TTL, CACHE_MAX_ENTRIES
+
+class ResponseCache:
+    """On-disk cache of raw Odds API responses with a TTL and size-based eviction"""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(path, params):
+        """
+        Build a cache key for a request
+
+        The API key is left out so that rotating keys does not invalidate the cache.
+
+        Args:
+            path (str): Request URL without the query string; including the base URL
+                keeps responses from a replay server apart from the real API's
+            params (dict): Query parameters
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        parts = [path] + [f"{k}={params[k]}" for k in sorted(params) if k != 'api_key']
+        return hashlib.sha1("&".join(parts).encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.meta.json")
+
+    def get(self, key, max_age=None):
+        """
+        Look up a cached response
+
+        Args:
+            key (str): Cache key from make_key
+            max_age (float): Override for the TTL in seconds, None to use the cache TTL
+
+        Returns:
+            tuple: (body bytes, headers dict) or None if missing or expired
+        """
+        max_age = self.ttl if max_age is None else max_age
+        entry = self._read(key, max_age)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return entry
+
+    def get_stream(self, key, max_age=None, chunk_size=65536):
+        """
+        Look up a cached response without reading the whole body into memory
+
+        Args:
+            key (str): Cache key from make_key
+            max_age (float): Override for the TTL in seconds, None to use the cache TTL
+            chunk_size (int): Size of the chunks read from disk
+
+        Returns:
+            tuple: (iterator of body chunks, headers dict) or None if missing or expired
+        """
+        max_age = self.ttl if max_age is None else max_age
+        meta = self._read_meta(key, max_age)
+
+        try:
+            body_file = open(self._body_path(key), 'rb') if meta is not None else None
+        except OSError:
+            body_file = None
+
+        with self._lock:
+            if body_file is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if body_file is None:
+            return None
+
+        return self._iter_file(body_file, chunk_size), meta.get('headers', {})
+
+    @staticmethod
+    def _iter_file(body_file, chunk_size):
+        with body_file:
+            while True:
+                chunk = body_file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def _read_meta(self, key, max_age):
+        try:
+            with open(self._meta_path(key), 'r') as f:
+                meta = json.load(f)
+            if time.time() - meta['fetched_at'] > max_age:
+                return None
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return meta
+
+    def _read(self, key, max_age):
+        meta = self._read_meta(key, max_age)
+        if meta is None:
+            return None
+
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        return body, meta.get('headers', {})
+
+    def set(self, key, body, headers=None):
+        """
+        Store a response body and the headers worth keeping (e.g. quota usage)
+
+        Files are written to a temporary name and renamed so concurrent readers
+        never see a partial entry.
+        """
+        meta = {
+            'fetched_at': time.time(),
+            'headers': dict(headers or {}),
+        }
+
+        self._atomic_write(self._body_path(key), body)
+        self._atomic_write(self._meta_path(key), json.dumps(meta).encode('utf-8'))
+        self.evict()
+
+    def set_stream(self, key, chunks, headers=None):
+        """
+        Pass body chunks through while writing them to the cache
+
+        The entry is only stored once every chunk has been consumed, so an
+        interrupted download never leaves a truncated body behind.
+
+        Args:
+            key (str): Cache key from make_key
+            chunks (iterable): Body chunks
+            headers (dict): Headers worth keeping (e.g. quota usage)
+
+        Yields:
+            The chunks, unchanged
+        """
+        body_path = self._body_path(key)
+        tmp_path = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        complete = False
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            if complete:
+                os.replace(tmp_path, body_path)
+                meta = {'fetched_at': time.time(), 'headers': dict(headers or {})}
+                self._atomic_write(self._meta_path(key), json.dumps(meta).encode('utf-8'))
+                self.evict()
+            else:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _atomic_write(self, path, data):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """
+        Remove the oldest entries beyond max_entries
+
+        Expired entries are kept until they are pushed out so that the last
+        response for a request is still available when the API is unreachable.
+        """
+        entries = []
+
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+
+        for name in names:
+            if not name.endswith('.meta.json'):
+                continue
+            key = name[:-len('.meta.json')]
+            try:
+                mtime = os.path.getmtime(self._meta_path(key))
+            except OSError:
+                continue
+            entries.append((mtime, key))
+
+        entries.sort(reverse=True)
+
+        for mtime, key in entries[self.max_entries:]:
+            self.remove(key)
+
+    def remove(self, key):
+        """Remove a single entry"""
+        for path in (self._meta_path(key), self._body_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """Get hit/miss counts"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
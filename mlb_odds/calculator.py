@@ -92,7 +92,7 @@ class EVCalculator:
         return opportunities 
     
     @staticmethod
-    def find_best_value_bets(games, min_odds=1.5, max_odds=10.0):
+    def find_best_value_bets(games, min_odds=1.5, max_odds=10.0, devig='multiplicative'):
         """
         Find bets with positive expected value using market consensus as "true" probability
         
@@ -100,6 +100,7 @@ class EVCalculator:
             games (list): List of GameOdds objects
             min_odds (float): Minimum odds to consider
             max_odds (float): Maximum odds to consider
+            devig (str): How the margin is removed from the consensus (see devig.METHODS)
             
         Returns:
             list: List of value bets ranked by EV
@@ -123,9 +124,14 @@ class EVCalculator:
             avg_away_implied = sum(away_implied_probs) / len(away_implied_probs)
             
             # Normalize to ensure they sum to 1
-            total_prob = avg_home_implied + avg_away_implied
-            home_true_prob = avg_home_implied / total_prob
-            away_true_prob = avg_away_implied / total_prob
+            if devig == 'multiplicative':
+                total_prob = avg_home_implied + avg_away_implied
+                home_true_prob = avg_home_implied / total_prob
+                away_true_prob = avg_away_implied / total_prob
+            else:
+                from .devig import default_cache
+                fair = default_cache.fair_probabilities([[avg_home_implied, avg_away_implied]], devig)[0]
+                home_true_prob, away_true_prob = float(fair[0]), float(fair[1])
             
             # Check each bookmaker's odds for positive EV
             for odds_data in home_odds_list:
@@ -1,10 +1,75 @@
+import os
+
 # API Configuration
 API_KEY = '3c43252d34aca9c142d75fc1ba2ac0b1'  # Replace with your actual API key
-API_BASE_URL = 'https://api.the-odds-api.com/v4'
+# Set ODDS_API_BASE_URL (or pass --base-url) to use a replay server instead, e.g. http://127.0.0.1:8081/v4
+API_BASE_URL = os.environ.get('ODDS_API_BASE_URL', 'https://api.the-odds-api.com/v4')
 
 # Odds API settings
 SPORT = 'baseball_mlb'  # MLB games
+SPORTS = [SPORT]  # sports scanned when fanning out requests
 REGIONS = 'us'  # us odds format
 MARKETS = 'h2h'  # moneyline odds
 ODDS_FORMAT = 'decimal'  # Use decimal odds for easier calculations
-DATE_FORMAT = 'iso' 
\ No newline at end of file
+DATE_FORMAT = 'iso' 
+
+# Response cache settings
+CACHE_DIR = '.odds_cache'  # on-disk cache of raw API responses
+CACHE_TTL = 300  # seconds a cached response is served before refetching
+CACHE_MAX_ENTRIES = 64  # oldest entries are evicted beyond this count
+
+# HTTP connection pool settings
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 8
+REQUEST_TIMEOUT = 30  # seconds
+
+# Concurrent fetch settings
+MAX_CONCURRENCY = 4  # simultaneous requests when fetching several sports/regions
+RATE_LIMIT = 5  # requests per second across all threads
+
+# Watch mode settings
+# (seconds until the next game starts, seconds between polls), checked in order
+WATCH_SCHEDULE = [
+    (60 * 60, 60),  # within an hour of first pitch (or in progress): every minute
+    (6 * 60 * 60, 5 * 60),  # within six hours: every 5 minutes
+    (24 * 60 * 60, 15 * 60),  # within a day: every 15 minutes
+]
+WATCH_MIN_INTERVAL = 60  # never poll more often than this
+WATCH_MAX_INTERVAL = 60 * 60  # games days away are polled hourly
+WATCH_QUOTA_RESERVE = 10  # requests kept back for manual runs before the quota resets
+
+# Storage settings
+DB_PATH = 'mlb_arbitrage.db'  # SQLite database for odds snapshots and opportunities
+ARCHIVE_DIR = 'odds_archive'  # compressed binary snapshot archive, one file per day
+
+# Local server settings (--serve)
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8080
+SERVER_STALE_POLLS = 3  # answer 503 once this many poll intervals pass without a successful poll
+
+# Replay server settings (python -m mlb_odds.replay)
+REPLAY_DIR = 'fixtures'  # recorded sports.json and <sport>.json odds responses
+REPLAY_PORT = 8081
+REPLAY_QUOTA = 500  # requests remaining when no quota was recorded
+
+# Alert settings (--alert)
+ALERT_MIN_EDGE_CHANGE = 0.5  # percentage points an opportunity's edge must move before it is alerted again
+ALERT_QUEUE_SIZE = 1000  # alerts waiting per sink; the oldest are dropped beyond this
+ALERT_DEDUP_SIZE = 10000  # opportunities remembered for deduplication
+ALERT_RETRIES = 3  # further attempts after a failed delivery
+ALERT_RETRY_DELAY = 1.0  # seconds before the first retry, doubled for each one after
+ALERT_RATE_LIMITS = {'stdout': None, 'file': None, 'webhook': 1.0}  # deliveries per second, None for unlimited
+ALERT_WEBHOOK_TIMEOUT = 5  # seconds
+
+# Steam detection settings (--steam)
+STEAM_WINDOW = 120  # seconds within which moves across books count as coordinated (polls are at least a minute apart)
+STEAM_MIN_BOOKS = 3  # books that must move an outcome the same way
+STEAM_MIN_MOVE = 0.02  # smallest relative price change counted as a move
+STEAM_HISTORY = 16  # (timestamp, price) points kept per bookmaker and outcome
+
+# Analysis settings
+DEVIG_METHODS = ('multiplicative', 'power', 'shin')  # ways to remove the bookmaker margin
+BATCH_MIN_GAMES = 100  # slates at least this large use the NumPy value bet engine
+
+# Logging
+LOG_FILE = 'mlb_odds.log'
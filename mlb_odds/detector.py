@@ -0,0 +1,195 @@
+import heapq
+import itertools
+from .arbitrage import ArbitrageCalculator
+from .calculator import EVCalculator
+
+class TopK:
+    """
+    Ranking of scored items supporting O(log n) insert, update and removal
+
+    Items live in a max-heap; removed or re-scored entries are left in place
+    and skipped lazily, and the heap is rebuilt once stale entries outnumber
+    live ones.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}  # key -> (sequence, item)
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, key):
+        return key in self._live
+
+    def push(self, key, score, item):
+        """Insert or re-score an item"""
+        sequence = next(self._counter)
+        self._live[key] = (sequence, item)
+        heapq.heappush(self._heap, (-score, sequence, key))
+        self._compact()
+
+    def remove(self, key):
+        """Remove an item, returning it (or None if it was not ranked)"""
+        entry = self._live.pop(key, None)
+        self._compact()
+        return entry[1] if entry else None
+
+    def _is_live(self, entry):
+        _, sequence, key = entry
+        live = self._live.get(key)
+        return live is not None and live[0] == sequence
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self._live) + 16:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+    def top(self, k):
+        """The k highest scored items, best first"""
+        popped = []
+        result = []
+
+        while self._heap and len(result) < k:
+            entry = heapq.heappop(self._heap)
+            if self._is_live(entry):
+                popped.append(entry)
+                result.append(self._live[entry[2]][1])
+
+        # Stale entries popped on the way are simply dropped
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+
+        return result
+
+class OpportunityDetector:
+    """
+    Incrementally maintained arbitrage and value bet rankings
+
+    Results are cached per game, so each update only recomputes the games whose
+    odds changed and adjusts the rankings by the difference. Every update
+    reports which opportunities were added, updated or retracted.
+    """
+
+    def __init__(self, top_k=10, bankroll=100, min_return=0.0, min_odds=1.5, max_odds=10.0, devig='multiplicative'):
+        """
+        Args:
+            top_k (int): Default number of opportunities returned by top_arbitrage and top_value
+            bankroll (float): Total stake used to size arbitrage opportunities
+            min_return (float): Minimum guaranteed arbitrage return in percent
+            min_odds (float): Minimum odds to consider for value bets
+            max_odds (float): Maximum odds to consider for value bets
+            devig (str): How the margin is removed from consensus probabilities
+        """
+        self.top_k = top_k
+        self.bankroll = bankroll
+        self.min_return = min_return
+        self.min_odds = min_odds
+        self.max_odds = max_odds
+        self.devig = devig
+
+        self.arbitrage = TopK()
+        self.value = TopK()
+        self._results = {}  # game_id -> {key: (kind, opportunity)}
+
+    @staticmethod
+    def arbitrage_key(opportunity):
+        return ('arbitrage', opportunity['game_id'], opportunity['market'], opportunity['line'])
+
+    @staticmethod
+    def value_key(game, bet):
+        return ('value', game.game_id, bet['team'], bet['bookmaker'])
+
+    def _evaluate(self, game):
+        """All current opportunities of one game, keyed by identity"""
+        results = {}
+
+        for opportunity in ArbitrageCalculator.find_arbitrage([game], bankroll=self.bankroll, min_return=self.min_return):
+            results[self.arbitrage_key(opportunity)] = ('arbitrage', opportunity)
+
+        for bet in EVCalculator.find_best_value_bets([game], min_odds=self.min_odds, max_odds=self.max_odds, devig=self.devig):
+            results[self.value_key(game, bet)] = ('value', bet)
+
+        return results
+
+    def _ranking(self, kind):
+        return self.arbitrage if kind == 'arbitrage' else self.value
+
+    @staticmethod
+    def _score(kind, opportunity):
+        return opportunity['return_pct'] if kind == 'arbitrage' else opportunity['expected_value']
+
+    def update(self, games, removed_game_ids=()):
+        """
+        Recompute the given games and drop removed ones
+
+        Args:
+            games (iterable): GameOdds whose odds changed (or that are new)
+            removed_game_ids (iterable): Ids of games no longer on the slate
+
+        Returns:
+            dict: 'added', 'updated' and 'retracted' lists of (kind, opportunity)
+        """
+        events = {'added': [], 'updated': [], 'retracted': []}
+
+        for game in games:
+            previous = self._results.get(game.game_id, {})
+            current = self._evaluate(game)
+
+            for key, (kind, opportunity) in current.items():
+                old = previous.get(key)
+                if old is not None and old[1] == opportunity:
+                    continue
+
+                self._ranking(kind).push(key, self._score(kind, opportunity), opportunity)
+                events['added' if old is None else 'updated'].append((kind, opportunity))
+
+            for key, (kind, opportunity) in previous.items():
+                if key not in current:
+                    self._ranking(kind).remove(key)
+                    events['retracted'].append((kind, opportunity))
+
+            if current:
+                self._results[game.game_id] = current
+            else:
+                self._results.pop(game.game_id, None)
+
+        for game_id in removed_game_ids:
+            for key, (kind, opportunity) in self._results.pop(game_id, {}).items():
+                self._ranking(kind).remove(key)
+                events['retracted'].append((kind, opportunity))
+
+        return events
+
+    def apply_changes(self, slate, changes, include=None):
+        """
+        Update from a Slate change set, recomputing only the games it touches
+
+        Args:
+            slate (Slate): Slate the changes were applied to
+            changes (list): Price changes returned by Slate.apply / apply_games
+            include (callable): Optional predicate; games failing it are treated as removed
+
+        Returns:
+            dict: See update
+        """
+        changed = []
+        removed = []
+
+        for game_id in {change['game_id'] for change in changes}:
+            game = slate.get(game_id)
+            if game is None or (include is not None and not include(game)):
+                removed.append(game_id)
+            else:
+                changed.append(game)
+
+        return self.update(changed, removed)
+
+    def top_arbitrage(self, k=None):
+        """Best current arbitrage opportunities by guaranteed return"""
+        return self.arbitrage.top(k or self.top_k)
+
+    def top_value(self, k=None):
+        """Best current value bets by expected value"""
+        return self.value.top(k or self.top_k)
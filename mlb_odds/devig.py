@@ -0,0 +1,156 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from .config import DEVIG_METHODS as METHODS
+
+# Bisection steps; each halves the bracket, so 60 steps reach float precision
+ITERATIONS = 60
+
+def _prepared(implied):
+    """Split a NaN padded array into (values with 0 in unused slots, mask of used slots)"""
+    implied = np.atleast_2d(np.asarray(implied, dtype=float))
+    mask = ~np.isnan(implied)
+    return np.where(mask, implied, 0.0), mask
+
+def multiplicative(implied):
+    """Proportional de-vig: scale every implied probability by the same factor"""
+    values, mask = _prepared(implied)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fair = values / values.sum(axis=1, keepdims=True)
+    return np.where(mask, fair, np.nan)
+
+def power(implied):
+    """
+    Power de-vig: find k with sum(p ** k) == 1 and use p ** k
+
+    Shrinks longshots more than favourites, unlike the multiplicative method.
+    Solved by bisection on every row at once.
+    """
+    values, mask = _prepared(implied)
+    rows = values.shape[0]
+    low = np.full(rows, 1e-3)
+    high = np.full(rows, 100.0)
+
+    for _ in range(ITERATIONS):
+        k = (low + high) / 2
+        total = (values ** k[:, np.newaxis]).sum(axis=1)
+        # sum(p ** k) decreases with k
+        too_low = total > 1
+        low = np.where(too_low, k, low)
+        high = np.where(too_low, high, k)
+
+    k = (low + high) / 2
+    return np.where(mask, values ** k[:, np.newaxis], np.nan)
+
+def _shin_probabilities(values, booksum, z):
+    z = z[:, np.newaxis]
+    return (np.sqrt(z ** 2 + 4 * (1 - z) * values ** 2 / booksum) - z) / (2 * (1 - z))
+
+def shin(implied):
+    """
+    Shin de-vig: model the margin as protection against insider trading
+
+    Finds the insider share z for which the Shin probabilities sum to 1.
+    Rows without a margin (booksum <= 1) fall back to the multiplicative method.
+    """
+    values, mask = _prepared(implied)
+    booksum = values.sum(axis=1, keepdims=True)
+    rows = values.shape[0]
+    low = np.zeros(rows)
+    high = np.full(rows, 0.999)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(ITERATIONS):
+            z = (low + high) / 2
+            total = _shin_probabilities(values, booksum, z).sum(axis=1)
+            # The probabilities sum to sqrt(booksum) at z=0 and decrease with z
+            too_low = total > 1
+            low = np.where(too_low, z, low)
+            high = np.where(too_low, high, z)
+
+        fair = _shin_probabilities(values, booksum, (low + high) / 2)
+        fair = np.where(booksum > 1, fair, values / booksum)
+
+    return np.where(mask, fair, np.nan)
+
+_SOLVERS = {
+    'multiplicative': multiplicative,
+    'power': power,
+    'shin': shin,
+}
+
+def devig(implied, method='multiplicative'):
+    """
+    Remove the bookmaker margin from implied probabilities
+
+    Args:
+        implied (array): Implied probabilities, one market per row, NaN in unused slots
+        method (str): One of METHODS
+
+    Returns:
+        ndarray: Fair probabilities with the same shape (NaN in unused slots)
+    """
+    if method not in _SOLVERS:
+        raise ValueError(f"Unknown de-vig method {method!r}, expected one of {', '.join(METHODS)}")
+    return _SOLVERS[method](implied)
+
+class DevigCache:
+    """
+    Memoizes fair probabilities per (method, implied probability vector)
+
+    Once max_entries vectors are held, the least recently used are evicted.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def fair_probabilities(self, implied, method='multiplicative'):
+        """
+        De-vig many markets, solving only vectors not seen before
+
+        Args:
+            implied (array): Implied probabilities, one market per row, NaN in unused slots
+            method (str): One of METHODS
+
+        Returns:
+            ndarray: Fair probabilities with the same shape
+        """
+        implied = np.atleast_2d(np.asarray(implied, dtype=float))
+        keys = [(method, row.tobytes()) for row in implied]
+
+        # Results for this call are kept locally, so evicting never loses one of its rows
+        found = {}
+        pending = {}  # first row of every vector that still needs solving
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in found or key in pending:
+                    continue
+                fair = self._cache.get(key)
+                if fair is None:
+                    pending[key] = i
+                else:
+                    self._cache.move_to_end(key)
+                    found[key] = fair
+
+        if pending:
+            solved = devig(implied[list(pending.values())], method)
+
+            with self._lock:
+                for key, fair in zip(pending, solved):
+                    found[key] = self._cache[key] = fair
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        return np.array([found[key] for key in keys]).reshape(implied.shape)
+
+    def clear(self):
+        """Forget every memoized vector"""
+        with self._lock:
+            self._cache.clear()
+
+default_cache = DevigCache()
@@ -1,24 +1,37 @@
 import argparse
+import contextlib
 import logging
 import sys
-from datetime import datetime, timedelta
-from tabulate import tabulate
-from .api_client import OddsApiClient
-from .models import GameOdds
+from datetime import datetime, timedelta, timezone
+from .config import (
+    API_BASE_URL, CACHE_TTL, SPORTS, REGIONS, MARKETS, MAX_CONCURRENCY, RATE_LIMIT, DEVIG_METHODS,
+    BATCH_MIN_GAMES, LOG_FILE, SERVER_PORT, ALERT_MIN_EDGE_CHANGE,
+)
 from .calculator import EVCalculator
+from .metrics import metrics
+from .output import FORMATS as OUTPUT_FORMATS
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("mlb_odds.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Everything else (requests, tabulate, numpy and the modules using them) is
+# imported where it is first needed, so --help and offline runs start fast
 
 logger = logging.getLogger("MLBOdds")
 
+def setup_logging(stream=sys.stdout):
+    """Log to mlb_odds.log and a console stream; called once the arguments are known to be valid"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_FILE),
+            logging.StreamHandler(stream)
+        ]
+    )
+
+def tabulate(rows, **kwargs):
+    """tabulate.tabulate, imported on first use"""
+    from tabulate import tabulate as render
+    return render(rows, **kwargs)
+
 def display_games(games):
     """Display games and their odds in a table"""
     rows = []
@@ -44,8 +57,25 @@ def display_games(games):
         tablefmt="grid"
     ))
 
-def display_arbitrage(opportunities):
-    """Display arbitrage opportunities in a table"""
+def format_line(market, line):
+    """Describe a market line, e.g. 'spreads -1.5' or 'totals 8.5'"""
+    if line is None:
+        return market
+    return f"{market} {line:+g}" if 'spreads' in market else f"{market} {line:g}"
+
+def format_leg(leg, market):
+    """Describe one outcome of an arbitrage with its stake"""
+    if leg['point'] is None:
+        name = leg['name']
+    elif 'spreads' in market:
+        name = f"{leg['name']} {leg['point']:+g}"
+    else:
+        name = f"{leg['name']} {leg['point']:g}"
+
+    return f"{name} {leg['odds']} @ {leg['bookmaker']}: ${leg['stake']}"
+
+def display_arbitrage_stakes(opportunities):
+    """Display arbitrage opportunities across markets with the stake on each outcome"""
     if not opportunities:
         print("\nNo arbitrage opportunities found")
         return
@@ -53,12 +83,14 @@ def display_arbitrage(opportunities):
     rows = []
     
     for opp in opportunities:
+        legs = "\n".join(format_leg(leg, opp['market']) for leg in opp['outcomes'])
+        
         row = [
             opp['game'],
-            f"{opp['away_team']['name']} ({opp['away_team']['best_odds']} @ {opp['away_team']['bookmaker']})",
-            f"{opp['home_team']['name']} ({opp['home_team']['best_odds']} @ {opp['home_team']['bookmaker']})",
-            f"${opp['away_team']['ev']}",
-            f"${opp['home_team']['ev']}"
+            format_line(opp['market'], opp['line']),
+            legs,
+            f"${opp['total_stake']}",
+            f"${opp['guaranteed_profit']} ({opp['return_pct']}%)"
         ]
         
         rows.append(row)
@@ -66,7 +98,7 @@ def display_arbitrage(opportunities):
     print("\nArbitrage Opportunities:")
     print(tabulate(
         rows,
-        headers=["Game", "Away Team (Odds @ Bookmaker)", "Home Team (Odds @ Bookmaker)", "Away EV", "Home EV"],
+        headers=["Game", "Market", "Outcome Odds @ Bookmaker: Stake", "Total Stake", "Guaranteed Profit"],
         tablefmt="grid"
     ))
 
@@ -188,61 +220,249 @@ def display_all_bookmaker_odds(games):
         tablefmt="grid"
     ))
 
-def main():
-    parser = argparse.ArgumentParser(description="MLB Odds Finder")
-    parser.add_argument("--show-all", action="store_true", help="Show all games, not just today's")
-    parser.add_argument("--team", type=str, help="Show detailed odds for a specific team")
-    parser.add_argument("--arbitrage", action="store_true", help="Find arbitrage opportunities")
-    parser.add_argument("--value", action="store_true", help="Find positive expected value bets")
-    parser.add_argument("--value-limit", type=int, default=10, help="Limit value bets shown (default: 10, 0 for all)")
-    parser.add_argument("--min-odds", type=float, default=1.5, help="Minimum odds to consider for value bets")
-    parser.add_argument("--max-odds", type=float, default=10.0, help="Maximum odds to consider for value bets")
-    parser.add_argument("--date", type=str, help="Show games for a specific date (format: YYYY-MM-DD)")
-    parser.add_argument("--all-odds", action="store_true", help="Show all odds from all bookmakers for all games")
+def selected_dates(args):
+    """The [start, end) date range selected on the command line, or None for all games"""
+    if args.date:
+        # Parse the date string to a date object (validated in main)
+        selected_date = datetime.strptime(args.date, "%Y-%m-%d").date()
+        return selected_date, selected_date + timedelta(days=1)
     
-    args = parser.parse_args()
+    # Today's games if not showing all and no specific date
+    if not args.show_all:
+        today = datetime.now().date()
+        return today, today + timedelta(days=1)
     
-    client = OddsApiClient()
+    return None
+
+def game_filter(args):
+    """Predicate matching games on the dates selected on the command line"""
+    dates = selected_dates(args)
     
-    # Get MLB odds
-    logger.info("Fetching MLB odds from the API")
-    data = client.get_odds('baseball_mlb')
+    if dates is None:
+        return lambda game: True
     
-    if not data:
-        logger.error("Failed to fetch odds data")
+    start, end = dates
+    return lambda game: game.commence_time.date() >= start and game.commence_time.date() < end
+
+def display_price_history(history):
+    """Display every stored price for a team"""
+    if not history:
+        print("\nNo stored prices found")
         return
     
-    # Convert to our models
-    games = [GameOdds.from_api(game_data) for game_data in data]
-    logger.info(f"Fetched odds for {len(games)} MLB games")
+    rows = [
+        [
+            entry['timestamp'][:19],
+            entry['game'],
+            entry['bookmaker'],
+            entry['outcome'] if entry['point'] is None else f"{entry['outcome']} {entry['point']:+g}",
+            entry['price']
+        ]
+        for entry in history
+    ]
     
-    # Filter games by date if specified
-    if args.date:
-        try:
-            # Parse the date string to a date object
-            selected_date = datetime.strptime(args.date, "%Y-%m-%d").date()
-            next_date = selected_date + timedelta(days=1)
-            
-            # Filter games for the selected date
-            games = [
-                game for game in games 
-                if game.commence_time.date() >= selected_date and game.commence_time.date() < next_date
-            ]
-            logger.info(f"Filtered to {len(games)} games scheduled for {args.date}")
-        except ValueError:
-            logger.error(f"Invalid date format. Please use YYYY-MM-DD format.")
-            return
-    # Filter to today's games if not showing all and no specific date
-    elif not args.show_all:
-        today = datetime.now().date()
-        tomorrow = today + timedelta(days=1)
-        games = [
-            game for game in games 
-            if game.commence_time.date() >= today and game.commence_time.date() < tomorrow
+    print("\nPrice History:")
+    print(tabulate(
+        rows,
+        headers=["Time (UTC)", "Game", "Bookmaker", "Outcome", "Odds"],
+        tablefmt="grid"
+    ))
+
+def display_movers(movers, minutes):
+    """Display the prices that moved the most recently"""
+    if not movers:
+        print(f"\nNo price moves in the last {minutes} minutes")
+        return
+    
+    rows = [
+        [
+            mover['game'],
+            mover['bookmaker'],
+            mover['market'],
+            mover['outcome'] if mover['point'] is None else f"{mover['outcome']} {mover['point']:g}",
+            mover['open'],
+            mover['close'],
+            f"{mover['move']:+.2f}%"
         ]
-        logger.info(f"Filtered to {len(games)} games scheduled for today")
+        for mover in movers
+    ]
+    
+    print(f"\nBiggest Movers in the Last {minutes} Minutes:")
+    print(tabulate(
+        rows,
+        headers=["Game", "Bookmaker", "Market", "Outcome", "Open", "Now", "Implied Prob Move"],
+        tablefmt="grid"
+    ))
+
+def display_steam(signals, slate):
+    """Display coordinated line moves and the books that have not followed"""
+    rows = []
+    
+    for signal in signals:
+        game = slate.get(signal['game_id'])
+        outcome = signal['outcome'] if signal['point'] is None else f"{signal['outcome']} {signal['point']:+g}"
+        moved = ", ".join(f"{row['title']} {row['old_price']}→{row['new_price']}" for row in signal['moved'])
+        stale = ", ".join(f"{row['title']} {row['price']}" for row in signal['stale']) or "-"
+        
+        rows.append([
+            str(game) if game else signal['game_id'],
+            signal['market'],
+            outcome,
+            f"{signal['direction']} {signal['average_move']:+.1%}",
+            moved,
+            stale
+        ])
+    
+    print(f"\nSteam on {len(signals)} outcomes:")
+    print(tabulate(
+        rows,
+        headers=["Game", "Market", "Outcome", "Move", "Moved", "Not Followed (price)"],
+        tablefmt="grid"
+    ))
+
+def show_history(args):
+    """Answer --history from the stored snapshots without calling the API"""
+    from .storage import OddsStore
+    
+    with OddsStore() as store:
+        if args.team:
+            dates = selected_dates(args)
+            since, until = (None, None)
+            if dates is not None:
+                since = datetime.combine(dates[0], datetime.min.time())
+                until = datetime.combine(dates[1], datetime.min.time())
+            
+            history = store.price_history(
+                args.team,
+                bookmaker=args.bookmaker,
+                market=args.markets.split(",")[0],
+                since=since,
+                until=until
+            )
+            display_price_history(history)
+        else:
+            since = datetime.now(timezone.utc) - timedelta(minutes=args.movers)
+            display_movers(store.biggest_movers(since), args.movers)
+
+def request_filters(args):
+    """
+    Push the date and team selection down into the request
+    
+    The selected dates become the API's commence time range and --team a
+    predicate on raw events, so games that would be filtered out are never
+    downloaded or never parsed into GameOdds.
+    
+    Returns:
+        dict: commence_from, commence_to and event_filter arguments for get_odds_many
+    """
+    filters = {}
+    dates = selected_dates(args)
+    
+    if dates is not None:
+        start, end = dates
+        filters['commence_from'] = datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc)
+        # commenceTimeTo is inclusive
+        filters['commence_to'] = datetime.combine(end, datetime.min.time(), tzinfo=timezone.utc) - timedelta(seconds=1)
+    
+    # --team selects the report unless --all-odds comes first
+    if args.team and not args.all_odds:
+        team = args.team.lower()
+        filters['event_filter'] = lambda event: (
+            team in (event.get('home_team') or '').lower() or team in (event.get('away_team') or '').lower()
+        )
+    
+    return filters
+
+def load_offline(sports, regions, args):
+    """The latest odds available without calling the API: cached responses of any age, else the database"""
+    from .api_client import OddsApiClient
+    from .cache import ResponseCache
+    
+    client = OddsApiClient(base_url=args.base_url, cache=ResponseCache(ttl=args.cache_ttl), offline=True)
+    filters = request_filters(args)
+    games = client.get_odds_many(sports, regions, markets=args.markets, max_workers=args.concurrency, max_age=float('inf'), **filters)
+    
+    if not games and 'commence_from' in filters:
+        # A cached response for every date still covers the selected one
+        games = client.get_odds_many(
+            sports, regions, markets=args.markets, max_workers=args.concurrency, max_age=float('inf'),
+            event_filter=filters.get('event_filter')
+        )
+    
+    if games:
+        logger.info(f"Showing cached odds for {len(games)} games")
+        return games
+    
+    from .storage import OddsStore
+    
+    with OddsStore() as store:
+        games, snapshot_time = store.latest_games(sports)
+    
+    if games:
+        logger.info(f"Showing {len(games)} games from the snapshot stored at {snapshot_time.strftime('%Y-%m-%d %H:%M')} UTC")
+    
+    return games
+
+def filter_games(games, args):
+    """Filter games to the date selected on the command line (today unless --show-all)"""
+    if selected_dates(args) is None:
+        return games
+    
+    keep = game_filter(args)
+    games = [game for game in games if keep(game)]
+    logger.info(f"Filtered to {len(games)} games scheduled for {args.date or 'today'}")
+    
+    return games
+
+def find_value_bets(games, args):
+    """Value bets for the options selected on the command line"""
+    # Both give identical results; small slates skip loading NumPy
+    if len(games) < BATCH_MIN_GAMES and args.devig == 'multiplicative':
+        calculator = EVCalculator
+    else:
+        from .batch import BatchEVCalculator as calculator
+    
+    return calculator.find_best_value_bets(
+        games,
+        min_odds=args.min_odds,
+        max_odds=args.max_odds,
+        devig=args.devig
+    )
+
+def write_report(games, args, out, header=True):
+    """Stream the report selected on the command line as CSV or JSON lines, with the CSV header unless header is False"""
+    from . import output
     
-    # Display results
+    if args.all_odds:
+        rows, fields = output.price_rows(games), output.PRICE_FIELDS
+    elif args.team:
+        rows, fields = output.team_rows(games, args.team), output.TEAM_FIELDS
+    elif args.arbitrage:
+        from .arbitrage import ArbitrageCalculator
+        
+        opportunities = ArbitrageCalculator.find_arbitrage(games, bankroll=args.bankroll, min_return=args.min_return)
+        rows, fields = output.arbitrage_rows(opportunities), output.ARBITRAGE_FIELDS
+    elif args.value:
+        rows, fields = output.value_rows(find_value_bets(games, args), args.value_limit), output.VALUE_FIELDS
+    else:
+        rows, fields = output.game_rows(games), output.GAME_FIELDS
+    
+    count = output.write_rows(rows, fields, args.format, out, header=header)
+    logger.info(f"Wrote {count} rows as {args.format}")
+
+def display_report(games, args, out=None, header=True):
+    """Display the report selected on the command line (header: see write_report)"""
+    # Rows are computed as they are written, so this covers calculating and rendering
+    with metrics.stage('report'):
+        if args.format != 'table':
+            write_report(games, args, out or sys.stdout, header=header)
+            return
+        
+        with contextlib.redirect_stdout(out or sys.stdout):
+            display_table(games, args)
+
+def display_table(games, args):
+    """Print the report selected on the command line as tables"""
     if args.all_odds:
         display_all_bookmaker_odds(games)
     elif args.team:
@@ -263,20 +483,297 @@ def main():
             print(f"\nGame: {game}")
             display_all_odds(game, team_name)
     elif args.arbitrage:
-        # Find arbitrage opportunities
-        opportunities = EVCalculator.find_arbitrage_opportunities(games)
-        display_arbitrage(opportunities)
+        from .arbitrage import ArbitrageCalculator
+        
+        # Find arbitrage opportunities on every fetched market
+        opportunities = ArbitrageCalculator.find_arbitrage(
+            games,
+            bankroll=args.bankroll,
+            min_return=args.min_return
+        )
+        display_arbitrage_stakes(opportunities)
     elif args.value:
         # Find value bets
-        value_bets = EVCalculator.find_best_value_bets(
-            games, 
-            min_odds=args.min_odds,
-            max_odds=args.max_odds
-        )
+        value_bets = find_value_bets(games, args)
         display_value_bets(value_bets, limit=args.value_limit)
     else:
         # Display all games
         display_games(games)
 
+def display_detector_update(detector, events, args):
+    """Log what changed since the last poll and display the current top opportunities"""
+    logger.info(
+        f"Opportunities: {len(events['added'])} new, {len(events['updated'])} updated, "
+        f"{len(events['retracted'])} retracted"
+    )
+    
+    for kind, opportunity in events['retracted']:
+        logger.info(f"Retracted {kind} opportunity: {opportunity['game']}")
+    
+    if args.arbitrage:
+        display_arbitrage_stakes(detector.top_arbitrage())
+    else:
+        display_value_bets(detector.top_value(args.value_limit or len(detector.value)), limit=0)
+
+def open_output(args):
+    """The file selected with --output, or stdout"""
+    if args.output:
+        return open(args.output, 'w', newline='', encoding='utf-8')
+    return contextlib.nullcontext(sys.stdout)
+
+def create_alerts(args):
+    """An AlertDispatcher for the --alert sinks, alerting on the selected report's opportunities"""
+    from .alerts import AlertDispatcher, parse_sink
+    
+    if args.arbitrage or args.value:
+        kinds = tuple(kind for kind, selected in (('arbitrage', args.arbitrage), ('value', args.value)) if selected)
+    else:
+        kinds = ('arbitrage', 'value')
+    
+    return AlertDispatcher([parse_sink(value) for value in args.alert], kinds=kinds, min_edge_change=args.alert_min_change)
+
+def watch(client, sports, regions, args, out=None):
+    """Poll the API until interrupted, redisplaying the report whenever the odds change"""
+    from .poller import OddsPoller
+    from .detector import OpportunityDetector
+    from .storage import OddsStore
+    from .archive import ArchiveWriter
+    
+    # The detector view only recomputes the games whose odds changed on each poll
+    detector_view = (args.arbitrage or args.value) and args.format == 'table'
+    detector = None
+    if detector_view or args.alert:
+        detector = OpportunityDetector(
+            bankroll=args.bankroll,
+            min_return=args.min_return,
+            min_odds=args.min_odds,
+            max_odds=args.max_odds,
+            devig=args.devig
+        )
+    
+    alerts = create_alerts(args).start() if args.alert else None
+    steam = None
+    if args.steam:
+        from .steam import SteamDetector
+        steam = SteamDetector()
+    store = OddsStore() if args.store else None
+    archive = ArchiveWriter() if args.archive else None
+    # Every poll appends to the same output, so CSV gets its header once
+    header_written = False
+    
+    def on_poll(games, changes):
+        nonlocal header_written
+        
+        if store is not None:
+            with metrics.stage('store'):
+                store.save_snapshot(games)
+        if archive is not None:
+            with metrics.stage('archive'):
+                archive.append(games)
+        
+        if detector is not None:
+            with metrics.stage('detect'):
+                events = detector.apply_changes(poller.slate, changes, include=game_filter(args))
+            if alerts is not None:
+                # Only queues; the sinks deliver on their own threads
+                alerts.publish_events(events, fetched_at=poller.last_poll)
+        
+        if detector_view:
+            with metrics.stage('report'):
+                display_detector_update(detector, events, args)
+        else:
+            display_report(filter_games(games, args), args, out, header=not header_written)
+            header_written = True
+        
+        if steam is not None:
+            with metrics.stage('steam'):
+                signals = steam.apply_changes(changes, poller.last_poll)
+            if signals and args.format == 'table':
+                display_steam(signals, poller.slate)
+            for signal in signals if args.format != 'table' else ():
+                logger.info(
+                    f"Steam: {signal['game_id']} {signal['market']} {signal['outcome']} {signal['direction']} "
+                    f"at {len(signal['moved'])} books, {len(signal['stale'])} not followed"
+                )
+        
+        if args.metrics_file:
+            metrics.write(args.metrics_file)
+    
+    poller = OddsPoller(
+        client, sports, regions,
+        markets=args.markets,
+        max_workers=args.concurrency,
+        on_update=on_poll
+    )
+    
+    logger.info(f"Watching odds for sports {sports} in regions {regions}")
+    try:
+        poller.run()
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    finally:
+        if alerts is not None:
+            alerts.stop()
+            logger.info(f"Alert deliveries: {alerts.stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description="MLB Odds Finder")
+    parser.add_argument("--show-all", action="store_true", help="Show all games, not just today's")
+    parser.add_argument("--team", type=str, help="Show detailed odds for a specific team")
+    parser.add_argument("--arbitrage", action="store_true", help="Find arbitrage opportunities")
+    parser.add_argument("--bankroll", type=float, default=100, help="Total stake to split across the outcomes of an arbitrage (default: 100)")
+    parser.add_argument("--min-return", type=float, default=0.0, help="Minimum guaranteed arbitrage return in percent (default: 0)")
+    parser.add_argument("--value", action="store_true", help="Find positive expected value bets")
+    parser.add_argument("--value-limit", type=int, default=10, help="Limit value bets shown (default: 10, 0 for all)")
+    parser.add_argument("--min-odds", type=float, default=1.5, help="Minimum odds to consider for value bets")
+    parser.add_argument("--max-odds", type=float, default=10.0, help="Maximum odds to consider for value bets")
+    parser.add_argument("--devig", choices=DEVIG_METHODS, default="multiplicative", help="How to remove the bookmaker margin from consensus probabilities (default: multiplicative)")
+    parser.add_argument("--date", type=str, help="Show games for a specific date (format: YYYY-MM-DD)")
+    parser.add_argument("--all-odds", action="store_true", help="Show all odds from all bookmakers for all games")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from the API instead of the local response cache")
+    parser.add_argument("--cache-ttl", type=int, default=CACHE_TTL, help=f"Seconds to serve cached API responses (default: {CACHE_TTL})")
+    parser.add_argument("--sports", type=str, default=",".join(SPORTS), help="Comma separated sport keys to fetch (default: %(default)s)")
+    parser.add_argument("--regions", type=str, default=REGIONS, help="Comma separated regions to fetch concurrently, e.g. us,us2,eu,uk (default: %(default)s)")
+    parser.add_argument("--markets", type=str, default=MARKETS, help="Comma separated markets to fetch, e.g. h2h,spreads,totals (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="Maximum simultaneous API requests (default: %(default)s)")
+    parser.add_argument("--rate-limit", type=float, default=RATE_LIMIT, help="Maximum API requests per second (default: %(default)s)")
+    parser.add_argument("--base-url", type=str, default=API_BASE_URL, help="Odds API base URL, e.g. a replay server at http://127.0.0.1:8081/v4 (default: %(default)s)")
+    parser.add_argument("--store", action="store_true", help="Save every fetched snapshot and arbitrage opportunity to the database")
+    parser.add_argument("--archive", action="store_true", help="Append every fetched snapshot to the compressed binary archive")
+    parser.add_argument("--history", action="store_true", help="Query stored snapshots instead of the API: prices for --team (optionally --bookmaker) on --date/today, or the biggest movers")
+    parser.add_argument("--bookmaker", type=str, help="Bookmaker key or name for --history")
+    parser.add_argument("--movers", type=int, default=30, help="Window in minutes for the biggest movers in --history (default: 30)")
+    parser.add_argument("--compact", action="store_true", help="Merge unchanged stored prices, downsample old history and reclaim disk space, then exit")
+    parser.add_argument("--retain-days", type=int, help="With --compact, keep full price history for this many days and daily open/high/low/close before that")
+    parser.add_argument("--offline", action="store_true", help="Show the most recent cached response, or else the latest stored snapshot, without calling the API")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="table", help="Output format; csv and jsonl stream one row per line (default: table)")
+    parser.add_argument("--output", type=str, help="Write the report to this file instead of stdout")
+    parser.add_argument("--serve", action="store_true", help="Run a local JSON server (/games, /arbitrage, /value, /team/<name>) fed by one shared poller")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port for --serve (default: %(default)s)")
+    parser.add_argument("--metrics-file", type=str, help="Record per-stage timings, cache hits and quota, and write them to this file in the Prometheus text format")
+    parser.add_argument("--alert", action="append", metavar="SINK", help="With --watch, alert on new arbitrage/value opportunities: stdout, a file path or a webhook URL (repeatable)")
+    parser.add_argument("--alert-min-change", type=float, default=ALERT_MIN_EDGE_CHANGE, help="Percentage points an opportunity's edge must move before it is alerted again (default: %(default)s)")
+    parser.add_argument("--steam", action="store_true", help="With --watch, flag outcomes several books move the same way at once, and the books that have not followed")
+    parser.add_argument("--watch", action="store_true", help="Keep running, polling more often as games approach and redisplaying on new odds")
+    
+    args = parser.parse_args()
+    
+    # Keep stdout clean for machine-readable output
+    setup_logging(sys.stderr if args.format != 'table' and not args.output else sys.stdout)
+    
+    if args.date:
+        try:
+            datetime.strptime(args.date, "%Y-%m-%d")
+        except ValueError:
+            logger.error(f"Invalid date format. Please use YYYY-MM-DD format.")
+            return
+    
+    if args.offline and (args.watch or args.serve or args.no_cache):
+        logger.error("--offline cannot be combined with --watch, --serve or --no-cache")
+        return
+    
+    if (args.alert or args.steam) and not args.watch:
+        logger.error("--alert and --steam need --watch")
+        return
+    
+    if args.alert and 'stdout' in args.alert and args.format != 'table' and not args.output:
+        logger.error("--alert stdout would mix alerts into the --format output on stdout; use --output or another sink")
+        return
+    
+    if args.metrics_file:
+        metrics.enable()
+    
+    if args.history:
+        show_history(args)
+        return
+    
+    if args.compact:
+        from .storage import OddsStore
+        
+        with OddsStore() as store:
+            stats = store.compact(retain_days=args.retain_days)
+        print(f"\nMerged {stats['merged']} unchanged prices and downsampled {stats['downsampled']} old prices")
+        print(f"Database size: {stats['bytes_before'] / 1e6:.1f} MB -> {stats['bytes_after'] / 1e6:.1f} MB")
+        return
+    
+    sports = [sport.strip() for sport in args.sports.split(",") if sport.strip()]
+    regions = [region.strip() for region in args.regions.split(",") if region.strip()]
+    
+    if args.offline:
+        games = load_offline(sports, regions, args)
+        
+        if not games:
+            logger.error("No cached or stored odds to show offline")
+            return
+        
+        with open_output(args) as out:
+            display_report(filter_games(games, args), args, out)
+        if args.metrics_file:
+            metrics.write(args.metrics_file)
+        return
+    
+    from .api_client import OddsApiClient
+    from .cache import ResponseCache
+    from .ratelimit import RateLimiter
+    
+    cache = None if args.no_cache else ResponseCache(ttl=args.cache_ttl)
+    client = OddsApiClient(
+        base_url=args.base_url,
+        cache=cache,
+        rate_limiter=RateLimiter(args.rate_limit, burst=args.concurrency)
+    )
+    
+    if args.serve:
+        from .server import serve
+        
+        serve(
+            client, sports, regions, args.markets,
+            port=args.port,
+            max_workers=args.concurrency,
+            bankroll=args.bankroll,
+            min_return=args.min_return,
+            min_odds=args.min_odds,
+            max_odds=args.max_odds,
+            devig=args.devig
+        )
+        return
+    
+    if args.watch:
+        with open_output(args) as out:
+            watch(client, sports, regions, args, out)
+        return
+    
+    # Stored and archived snapshots must hold the whole slate
+    filters = {} if args.store or args.archive else request_filters(args)
+    
+    # Get odds for every sport/region combination concurrently
+    logger.info(f"Fetching odds from the API for sports {sports} in regions {regions}")
+    games = client.get_odds_many(sports, regions, markets=args.markets, max_workers=args.concurrency, **filters)
+    
+    if games is None:
+        logger.error("Failed to fetch odds data")
+        return
+    
+    logger.info(f"Fetched odds for {len(games)} games")
+    
+    if args.store:
+        from .storage import OddsStore
+        
+        with metrics.stage('store'), OddsStore() as store:
+            store.save_snapshot(games)
+    
+    if args.archive:
+        from .archive import ArchiveWriter
+        
+        with metrics.stage('archive'), ArchiveWriter() as archive:
+            archive.append(games)
+    
+    games = filter_games(games, args)
+    with open_output(args) as out:
+        display_report(games, args, out)
+    
+    if args.metrics_file:
+        metrics.write(args.metrics_file)
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,165 @@
+import bisect
+import contextlib
+import os
+import threading
+import time
+
+# Upper bounds of the latency histogram buckets in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PREFIX = 'mlb_odds_'
+
+HELP = {
+    'stage_seconds': ('histogram', "Time spent in each stage of a run"),
+    'games_total': ('counter', "Games parsed from odds responses"),
+    'bookmakers_total': ('counter', "Bookmakers parsed from odds responses"),
+    'outcomes_total': ('counter', "Outcome prices parsed from odds responses"),
+    'cache_requests_total': ('counter', "Response cache lookups by result"),
+    'cache_hit_ratio': ('gauge', "Share of response cache lookups served from the cache"),
+    'api_requests_remaining': ('gauge', "Requests left in the API quota"),
+    'api_requests_used': ('gauge', "Requests used from the API quota"),
+    'alerts_total': ('counter', "Alerts by sink and result (delivered, failed, dropped)"),
+    'alert_latency_seconds': ('histogram', "Time from fetching the odds to delivering an alert"),
+}
+
+_NOOP = contextlib.nullcontext()
+
+class Metrics:
+    """
+    Counters, gauges and latency histograms exported in the Prometheus text format
+
+    Disabled by default: every call then returns immediately without taking
+    a lock or reading the clock, so instrumented code costs nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._gauges = {}
+        self._histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def inc(self, name, amount=1, **labels):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """Set a gauge"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        """Record one value in a histogram"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+            index = bisect.bisect_left(BUCKETS, value)
+            if index < len(BUCKETS):
+                histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def stage(self, name):
+        """Context manager timing a block into stage_seconds{stage=name}"""
+        if not self.enabled:
+            return _NOOP
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, stage=name)
+
+    def count_games(self, games):
+        """Count the games, bookmakers and outcome prices of a parsed slate"""
+        if not self.enabled:
+            return
+        bookmakers = 0
+        outcomes = 0
+        for game in games:
+            bookmakers += len(game.bookmakers)
+            for bookmaker in game.bookmakers:
+                for market in bookmaker.markets:
+                    outcomes += len(market.outcomes)
+        self.inc('games_total', len(games))
+        self.inc('bookmakers_total', bookmakers)
+        self.inc('outcomes_total', outcomes)
+
+    def cache_lookup(self, hit):
+        """Record a response cache hit or miss"""
+        self.inc('cache_requests_total', result='hit' if hit else 'miss')
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: (list(value[0]), value[1], value[2]) for key, value in self._histograms.items()}
+
+        hits = counters.get(('cache_requests_total', (('result', 'hit'),)), 0)
+        misses = counters.get(('cache_requests_total', (('result', 'miss'),)), 0)
+        if hits + misses:
+            gauges[('cache_hit_ratio', ())] = hits / (hits + misses)
+
+        samples = {}  # name -> lines
+        for (name, labels), value in counters.items():
+            samples.setdefault(name, []).append(f"{PREFIX}{name}{self._labels(labels)} {value}")
+        for (name, labels), value in gauges.items():
+            samples.setdefault(name, []).append(f"{PREFIX}{name}{self._labels(labels)} {value}")
+        for (name, labels), (buckets, total, count) in histograms.items():
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(f"{PREFIX}{name}_bucket{self._labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{PREFIX}{name}_bucket{self._labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{PREFIX}{name}_sum{self._labels(labels)} {total}")
+            lines.append(f"{PREFIX}{name}_count{self._labels(labels)} {count}")
+
+        output = []
+        for name in sorted(samples):
+            metric_type, help_text = HELP.get(name, ('untyped', name))
+            output.append(f"# HELP {PREFIX}{name} {help_text}")
+            output.append(f"# TYPE {PREFIX}{name} {metric_type}")
+            output.extend(samples[name])
+
+        return '\n'.join(output) + '\n'
+
+    def write(self, path):
+        """Atomically write the metrics to a file, e.g. for the node_exporter textfile collector"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+# Shared by every module; enabled by --metrics-file and --serve
+metrics = Metrics()
@@ -1,8 +1,32 @@
-from datetime import datetime
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp from the API
+    
+    Results are cached: repeated snapshots of the same slate share one
+    datetime per distinct timestamp instead of allocating a new one each time.
+    """
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def format_timestamp(value):
+    """Format a datetime the way the API does (UTC, trailing Z)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def intern_name(value):
+    """Intern team, bookmaker and market names so every snapshot shares one copy"""
+    return sys.intern(value) if isinstance(value, str) else value
 
 class GameOdds:
     """Model representing odds for a single game"""
     
+    __slots__ = ('game_id', 'sport', 'commence_time', 'home_team', 'away_team', 'bookmakers', '_index')
+    
     def __init__(self, game_id, sport, commence_time, home_team, away_team, bookmakers=None):
         self.game_id = game_id
         self.sport = sport
@@ -10,20 +34,20 @@ class GameOdds:
         self.home_team = home_team
         self.away_team = away_team
         self.bookmakers = bookmakers or []
+        self._index = None
         
     @classmethod
     def from_api(cls, api_data):
         """Create a GameOdds object from API data"""
         game_id = api_data.get('id')
-        sport = api_data.get('sport_key')
+        sport = intern_name(api_data.get('sport_key'))
         
         # Parse commence time
-        commence_time_str = api_data.get('commence_time')
-        commence_time = datetime.fromisoformat(commence_time_str.replace('Z', '+00:00'))
+        commence_time = parse_timestamp(api_data.get('commence_time'))
         
         # Get teams
-        home_team = api_data.get('home_team')
-        away_team = api_data.get('away_team')
+        home_team = intern_name(api_data.get('home_team'))
+        away_team = intern_name(api_data.get('away_team'))
         
         # Create instance
         game_odds = cls(game_id, sport, commence_time, home_team, away_team)
@@ -32,49 +56,128 @@ class GameOdds:
         for bm_data in api_data.get('bookmakers', []):
             bookmaker = Bookmaker.from_api(bm_data)
             game_odds.bookmakers.append(bookmaker)
+        
+        game_odds._build_index()
             
         return game_odds
     
-    def get_best_odds(self, team):
-        """Get the best (highest) odds for a team across all bookmakers"""
-        best_odds = 0
-        best_bookmaker = None
+    def to_dict(self):
+        """Convert to the API's event format"""
+        return {
+            'id': self.game_id,
+            'sport_key': self.sport,
+            'commence_time': format_timestamp(self.commence_time),
+            'home_team': self.home_team,
+            'away_team': self.away_team,
+            'bookmakers': [bookmaker.to_dict() for bookmaker in self.bookmakers]
+        }
+    
+    def add_bookmaker(self, bookmaker):
+        """Add a bookmaker's odds to the game"""
+        self.bookmakers.append(bookmaker)
+        self.invalidate_index()
+    
+    def invalidate_index(self):
+        """
+        Drop the outcome index
+        
+        Must be called after changing bookmakers, markets or prices in place;
+        the index is rebuilt on the next lookup.
+        """
+        self._index = None
+    
+    def _build_index(self):
+        """Index every price by (market, outcome name, point) in a single pass"""
+        index = {}
         
         for bookmaker in self.bookmakers:
             for market in bookmaker.markets:
-                if market.market_type == 'h2h':
-                    for outcome in market.outcomes:
-                        if outcome.name == team and outcome.price > best_odds:
-                            best_odds = outcome.price
-                            best_bookmaker = bookmaker.title
+                for outcome in market.outcomes:
+                    key = (market.market_type, outcome.name, outcome.point)
+                    quotes = index.get(key)
+                    if quotes is None:
+                        quotes = index[key] = OutcomeQuotes()
+                    quotes.add(bookmaker, outcome.price)
+        
+        self._index = index
+        return index
+    
+    @property
+    def index(self):
+        """Outcome index keyed by (market, outcome name, point), built on demand"""
+        if self._index is None:
+            return self._build_index()
+        return self._index
+    
+    def get_quotes(self, team, market='h2h', point=None):
+        """Get every bookmaker's price for an outcome, or None if no bookmaker offers it"""
+        return self.index.get((market, team, point))
+    
+    def get_best_odds(self, team, market='h2h', point=None):
+        """Get the best (highest) odds for a team across all bookmakers"""
+        quotes = self.get_quotes(team, market, point)
+        
+        if quotes is None:
+            return {
+                'odds': 0,
+                'bookmaker': None
+            }
         
         return {
-            'odds': best_odds,
-            'bookmaker': best_bookmaker
+            'odds': quotes.best_odds,
+            'bookmaker': quotes.best_bookmaker
         }
         
-    def get_all_odds(self, team):
+    def get_all_odds(self, team, market='h2h', point=None):
         """Get all odds for a team across all bookmakers"""
-        all_odds = []
+        quotes = self.get_quotes(team, market, point)
         
-        for bookmaker in self.bookmakers:
-            for market in bookmaker.markets:
-                if market.market_type == 'h2h':
-                    for outcome in market.outcomes:
-                        if outcome.name == team:
-                            all_odds.append({
-                                'bookmaker': bookmaker.title,
-                                'odds': outcome.price
-                            })
+        if quotes is None:
+            return []
         
-        return all_odds
+        return [
+            {
+                'bookmaker': bookmaker.title,
+                'odds': price
+            }
+            for bookmaker, price in quotes.quotes
+        ]
     
     def __str__(self):
         return f"{self.away_team} @ {self.home_team} ({self.commence_time.strftime('%Y-%m-%d %H:%M')})"
 
+class OutcomeQuotes:
+    """Every bookmaker's price for one outcome of a game, with the best price precomputed"""
+    
+    __slots__ = ('quotes', 'best_odds', 'best_bookmaker', '_sorted')
+    
+    def __init__(self):
+        self.quotes = []  # (Bookmaker, price) in bookmaker order
+        self.best_odds = 0
+        self.best_bookmaker = None
+        self._sorted = None
+        
+    def add(self, bookmaker, price):
+        """Add a bookmaker's price, keeping the first bookmaker to offer the best price"""
+        self.quotes.append((bookmaker, price))
+        self._sorted = None
+        
+        if price > self.best_odds:
+            self.best_odds = price
+            self.best_bookmaker = bookmaker.title
+    
+    @property
+    def sorted_prices(self):
+        """Prices from highest to lowest"""
+        if self._sorted is None:
+            self._sorted = sorted((price for _, price in self.quotes), reverse=True)
+        return self._sorted
+
 class Bookmaker:
     """Model representing a bookmaker with odds"""
     
+    __slots__ = ('key', 'title', 'last_update', 'markets')
+    
     def __init__(self, key, title, last_update, markets=None):
         self.key = key
         self.title = title
@@ -84,12 +187,11 @@ class Bookmaker:
     @classmethod
     def from_api(cls, api_data):
         """Create a Bookmaker object from API data"""
-        key = api_data.get('key')
-        title = api_data.get('title')
+        key = intern_name(api_data.get('key'))
+        title = intern_name(api_data.get('title'))
         
         # Parse last update time
-        last_update_str = api_data.get('last_update')
-        last_update = datetime.fromisoformat(last_update_str.replace('Z', '+00:00'))
+        last_update = parse_timestamp(api_data.get('last_update'))
         
         # Create instance
         bookmaker = cls(key, title, last_update)
@@ -100,10 +202,21 @@ class Bookmaker:
             bookmaker.markets.append(market)
             
         return bookmaker
+    
+    def to_dict(self):
+        """Convert to the API's bookmaker format"""
+        return {
+            'key': self.key,
+            'title': self.title,
+            'last_update': format_timestamp(self.last_update),
+            'markets': [market.to_dict() for market in self.markets]
+        }
 
 class Market:
     """Model representing a betting market (e.g., h2h, spreads)"""
     
+    __slots__ = ('market_type', 'outcomes')
+    
     def __init__(self, market_type, outcomes=None):
         self.market_type = market_type
         self.outcomes = outcomes or []
@@ -111,7 +224,7 @@ class Market:
     @classmethod
     def from_api(cls, api_data):
         """Create a Market object from API data"""
-        market_type = api_data.get('key')
+        market_type = intern_name(api_data.get('key'))
         
         # Create instance
         market = cls(market_type)
@@ -122,10 +235,19 @@ class Market:
             market.outcomes.append(outcome)
             
         return market
+    
+    def to_dict(self):
+        """Convert to the API's market format"""
+        return {
+            'key': self.market_type,
+            'outcomes': [outcome.to_dict() for outcome in self.outcomes]
+        }
 
 class Outcome:
     """Model representing an outcome in a betting market"""
     
+    __slots__ = ('name', 'price', 'point')
+    
     def __init__(self, name, price, point=None):
         self.name = name
         self.price = price  # Decimal odds
@@ -134,8 +256,18 @@ class Outcome:
     @classmethod
     def from_api(cls, api_data):
         """Create an Outcome object from API data"""
-        name = api_data.get('name')
+        name = intern_name(api_data.get('name'))
         price = api_data.get('price')
         point = api_data.get('point')
         
-        return cls(name, price, point) 
\ No newline at end of file
+        return cls(name, price, point) 
+    
+    def to_dict(self):
+        """Convert to the API's outcome format"""
+        data = {
+            'name': self.name,
+            'price': self.price
+        }
+        if self.point is not None:
+            data['point'] = self.point
+        return data
@@ -0,0 +1,139 @@
+import csv
+import json
+from .calculator import EVCalculator
+
+FORMATS = ('table', 'csv', 'jsonl')
+
+GAME_FIELDS = ['commence_time', 'game_id', 'away_team', 'home_team', 'away_odds', 'away_bookmaker', 'home_odds', 'home_bookmaker']
+PRICE_FIELDS = ['commence_time', 'game_id', 'game', 'bookmaker', 'market', 'outcome', 'point', 'odds', 'implied_probability']
+TEAM_FIELDS = ['game_id', 'game', 'team', 'bookmaker', 'odds', 'implied_probability', 'ev']
+ARBITRAGE_FIELDS = [
+    'game_id', 'game', 'market', 'line', 'return_pct', 'total_stake', 'guaranteed_profit',
+    'outcome', 'point', 'odds', 'bookmaker', 'stake', 'payout',
+]
+VALUE_FIELDS = [
+    'rank', 'game', 'team', 'is_home', 'bookmaker', 'odds', 'implied_probability',
+    'consensus_probability', 'edge', 'expected_value',
+]
+
+def game_rows(games):
+    """Best home and away odds of each game"""
+    for game in games:
+        home_odds = game.get_best_odds(game.home_team)
+        away_odds = game.get_best_odds(game.away_team)
+
+        yield {
+            'commence_time': game.commence_time.isoformat(),
+            'game_id': game.game_id,
+            'away_team': game.away_team,
+            'home_team': game.home_team,
+            'away_odds': away_odds['odds'],
+            'away_bookmaker': away_odds['bookmaker'],
+            'home_odds': home_odds['odds'],
+            'home_bookmaker': home_odds['bookmaker'],
+        }
+
+def price_rows(games):
+    """Every price of every market, straight from the models in bookmaker order"""
+    for game in sorted(games, key=lambda game: (game.commence_time, game.away_team, game.home_team)):
+        commence_time = game.commence_time.isoformat()
+        label = f"{game.away_team} @ {game.home_team}"
+
+        for bookmaker in game.bookmakers:
+            for market in bookmaker.markets:
+                for outcome in market.outcomes:
+                    yield {
+                        'commence_time': commence_time,
+                        'game_id': game.game_id,
+                        'game': label,
+                        'bookmaker': bookmaker.title,
+                        'market': market.market_type,
+                        'outcome': outcome.name,
+                        'point': outcome.point,
+                        'odds': outcome.price,
+                        'implied_probability': 1 / outcome.price if outcome.price else None,
+                    }
+
+def team_rows(games, team):
+    """Every bookmaker's odds for the games of a team, like --team"""
+    query = team.lower()
+
+    for game in games:
+        if query in game.home_team.lower():
+            name = game.home_team
+        elif query in game.away_team.lower():
+            name = game.away_team
+        else:
+            continue
+
+        for odds_data in game.get_all_odds(name):
+            implied_prob = EVCalculator.implied_probability(odds_data['odds'])
+            yield {
+                'game_id': game.game_id,
+                'game': str(game),
+                'team': name,
+                'bookmaker': odds_data['bookmaker'],
+                'odds': odds_data['odds'],
+                'implied_probability': implied_prob,
+                'ev': EVCalculator.calculate_ev(implied_prob, odds_data['odds']),
+            }
+
+def arbitrage_rows(opportunities):
+    """One row per outcome of each arbitrage opportunity"""
+    for opp in opportunities:
+        for leg in opp['outcomes']:
+            yield {
+                'game_id': opp['game_id'],
+                'game': opp['game'],
+                'market': opp['market'],
+                'line': opp['line'],
+                'return_pct': opp['return_pct'],
+                'total_stake': opp['total_stake'],
+                'guaranteed_profit': opp['guaranteed_profit'],
+                'outcome': leg['name'],
+                'point': leg['point'],
+                'odds': leg['odds'],
+                'bookmaker': leg['bookmaker'],
+                'stake': leg['stake'],
+                'payout': leg['payout'],
+            }
+
+def value_rows(value_bets, limit=None):
+    """Value bets with their rank, best first"""
+    for rank, bet in enumerate(value_bets[:limit] if limit else value_bets, 1):
+        yield {'rank': rank, **bet}
+
+def write_rows(rows, fields, output_format, out, header=True):
+    """
+    Write rows to a file as they are produced
+
+    Args:
+        rows (iterable): Dicts with the given fields
+        fields (list): Column names, in order
+        output_format (str): 'csv' or 'jsonl'
+        out (file): Text file to write to
+        header (bool): Write the CSV header row first; False when appending to
+            a file that already has one
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+
+    if output_format == 'csv':
+        writer = csv.DictWriter(out, fieldnames=fields, extrasaction='ignore')
+        if header:
+            writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif output_format == 'jsonl':
+        for row in rows:
+            out.write(json.dumps(row))
+            out.write('\n')
+            count += 1
+    else:
+        raise ValueError(f"Unknown output format {output_format!r}, expected csv or jsonl")
+
+    out.flush()
+    return count
@@ -0,0 +1,173 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from .metrics import metrics
+from .slate import Slate
+from .config import (
+    MARKETS, MAX_CONCURRENCY, WATCH_SCHEDULE, WATCH_MIN_INTERVAL,
+    WATCH_MAX_INTERVAL, WATCH_QUOTA_RESERVE,
+)
+
+logger = logging.getLogger(__name__)
+
+def seconds_until_quota_reset(now):
+    """Seconds until the start of next month (UTC), when the API quota resets"""
+    if now.month == 12:
+        reset = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    else:
+        reset = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    return (reset - now).total_seconds()
+
+class OddsPoller:
+    """Polls the Odds API on a schedule driven by game start times and the remaining quota"""
+
+    def __init__(self, client, sports, regions, markets=MARKETS, max_workers=MAX_CONCURRENCY,
+                 on_update=None, schedule=WATCH_SCHEDULE, min_interval=WATCH_MIN_INTERVAL,
+                 max_interval=WATCH_MAX_INTERVAL, quota_reserve=WATCH_QUOTA_RESERVE):
+        """
+        Args:
+            client (OddsApiClient): Client used for every poll
+            sports (list): Sport keys to poll
+            regions (list): Region keys to poll
+            markets (str): Comma separated market keys
+            max_workers (int): Maximum simultaneous requests per poll
+            on_update (callable): Called with the list of games and the list of price changes
+                whenever a poll returns new prices
+            schedule (list): (seconds until next game, poll interval) pairs, checked in order
+            min_interval (float): Shortest allowed interval between polls in seconds
+            max_interval (float): Interval used when no game is within the schedule
+            quota_reserve (int): Requests to leave unused before the quota resets
+        """
+        self.client = client
+        self.sports = sports
+        self.regions = regions
+        self.markets = markets
+        self.max_workers = max_workers
+        self.on_update = on_update
+        self.schedule = schedule
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.quota_reserve = quota_reserve
+
+        self.slate = Slate()
+        self.last_poll = None
+        self.last_success = None  # when a poll last returned odds
+        self.interval = None  # seconds until the next poll, once running
+        self._stop = threading.Event()
+
+    @property
+    def cost_per_poll(self):
+        """Quota spent by one poll (the API charges regions x markets per request)"""
+        markets = len([market for market in self.markets.split(",") if market.strip()])
+        return len(self.sports) * len(self.regions) * max(1, markets)
+
+    @property
+    def games(self):
+        """Games from the latest successful poll"""
+        return self.slate.games
+
+    def poll(self):
+        """
+        Fetch the latest odds, merge them into the slate and notify on_update if any price changed
+
+        Returns:
+            list: Price changes since the previous poll (see Slate)
+        """
+        # Always go to the API; the response still refreshes the on-disk cache
+        with metrics.stage('poll'):
+            games = self.client.get_odds_many(
+                self.sports, self.regions, markets=self.markets,
+                max_workers=self.max_workers, max_age=0
+            )
+        self.last_poll = datetime.now(timezone.utc)
+
+        if games is None:
+            logger.error("Poll failed, keeping previous games")
+            return []
+        self.last_success = self.last_poll
+
+        with metrics.stage('merge'):
+            changes = self.slate.apply_games(games)
+        if not changes:
+            logger.info(f"No odds changes across {len(self.slate)} games")
+            return changes
+
+        logger.info(f"{len(changes)} price changes across {len(self.slate)} games")
+
+        if self.on_update:
+            self.on_update(self.games, changes)
+
+        return changes
+
+    def schedule_interval(self, now):
+        """Poll interval based on how soon the next game starts"""
+        if not self.games:
+            return self.max_interval
+
+        # Games already in progress count as starting now
+        until_next = max(0, min((game.commence_time - now).total_seconds() for game in self.games))
+
+        for within, interval in self.schedule:
+            if until_next <= within:
+                return interval
+
+        return self.max_interval
+
+    def quota_interval(self, now):
+        """Shortest interval that keeps the remaining quota from running out before it resets"""
+        remaining = self.client.requests_remaining
+        if remaining is None:
+            return 0
+
+        until_reset = seconds_until_quota_reset(now)
+        polls_left = (remaining - self.quota_reserve) // self.cost_per_poll
+
+        if polls_left <= 0:
+            return until_reset
+
+        return until_reset / polls_left
+
+    def next_interval(self, now=None):
+        """
+        Seconds to wait before the next poll
+
+        Returns:
+            float: The schedule interval, stretched if needed to stay within the quota budget
+        """
+        now = now or datetime.now(timezone.utc)
+        interval = max(self.min_interval, self.schedule_interval(now))
+        budget = self.quota_interval(now)
+
+        if budget > interval:
+            logger.info(f"Stretching poll interval from {interval:.0f}s to {budget:.0f}s to stay within the API quota")
+            interval = budget
+
+        return interval
+
+    def run(self, max_polls=None):
+        """
+        Poll until stop() is called or max_polls polls have been made
+
+        Args:
+            max_polls (int): Stop after this many polls, None to run until stopped
+        """
+        polls = 0
+
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.exception(f"Poll failed: {e}")
+            polls += 1
+
+            if max_polls is not None and polls >= max_polls:
+                break
+
+            self.interval = self.next_interval()
+            logger.info(f"Next poll in {self.interval:.0f}s")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        """Stop a running poller after the current poll"""
+        self._stop.set()
@@ -0,0 +1,41 @@
+import threading
+import time
+
+class RateLimiter:
+    """Thread-safe token bucket limiting how often an action may run"""
+
+    def __init__(self, rate, burst=1):
+        """
+        Args:
+            rate (float): Tokens added per second
+            burst (int): Maximum number of tokens that can accumulate
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self):
+        """Take a token if one is available without waiting"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def wait_time(self):
+        """Seconds until the next token is available"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while not self.try_acquire():
+            time.sleep(self.wait_time())
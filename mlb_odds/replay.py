@@ -0,0 +1,391 @@
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+from .config import SERVER_HOST, REPLAY_DIR, REPLAY_PORT, REPLAY_QUOTA, MARKETS, REGIONS
+from .models import format_timestamp
+
+logger = logging.getLogger(__name__)
+
+SPORTS_FILE = 'sports.json'
+HEADERS_FILE = 'headers.json'
+
+# Markets recorded by --record, so any later request can be replayed
+RECORD_MARKETS = 'h2h,spreads,totals'
+
+# Statuses returned for injected errors
+ERROR_STATUSES = (429, 500, 503)
+
+def record(client, sports, fixture_dir=REPLAY_DIR, regions=REGIONS, markets=RECORD_MARKETS):
+    """
+    Save live API responses as fixtures for the replay server
+
+    Spends one request per sport times regions times markets.
+
+    Args:
+        client (OddsApiClient): Client used for the recording
+        sports (list): Sport keys to record
+        fixture_dir (str): Directory to write sports.json, <sport>.json and headers.json to
+        regions (str): Comma separated regions to record
+        markets (str): Comma separated markets to record
+
+    Returns:
+        bool: Whether every response was recorded
+    """
+    os.makedirs(fixture_dir, exist_ok=True)
+
+    responses = {SPORTS_FILE: client.get_sports()}
+    for sport in sports:
+        responses[f"{sport}.json"] = client.get_odds(sport, regions=regions, markets=markets, max_age=0)
+
+    if any(data is None for data in responses.values()):
+        logger.error("Failed to record every response, no fixtures written")
+        return False
+
+    responses[HEADERS_FILE] = {
+        'x-requests-remaining': client.requests_remaining,
+        'x-requests-used': client.requests_used,
+    }
+
+    for name, data in responses.items():
+        with open(os.path.join(fixture_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    logger.info(f"Recorded {len(sports)} sports to {fixture_dir}")
+    return True
+
+class FixtureReplay:
+    """
+    Recorded Odds API responses, replayed with quota accounting, injected errors and price drift
+
+    Prices drift in steps: every drift_interval seconds a share of the prices
+    take a random walk step. Encoded response bodies are reused until the
+    next step, so replaying costs about as much as serving a static file.
+    """
+
+    def __init__(self, fixture_dir=REPLAY_DIR, latency=0.0, jitter=0.0, error_rate=0.0, drift=0.0,
+                 drift_interval=60.0, drift_share=0.2, quota=None, seed=None):
+        """
+        Args:
+            fixture_dir (str): Directory with sports.json, one <sport>.json odds response per sport
+                and optionally headers.json with the recorded quota
+            latency (float): Seconds added to every response
+            jitter (float): Up to this many more seconds added at random
+            error_rate (float): Share of requests answered with a 429, 500 or 503
+            drift (float): Standard deviation of each log price step, 0 to replay prices unchanged
+            drift_interval (float): Seconds between price steps
+            drift_share (float): Share of prices that move on each step
+            quota (int): Requests remaining at start, None for the recorded quota
+            seed (int): Seed for drift, jitter and errors, None for a random seed
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drift = drift
+        self.drift_interval = drift_interval
+        self.drift_share = drift_share
+
+        self.sports, self.events, recorded = self._load(fixture_dir)
+        self.requests_used = int(recorded.get('x-requests-used') or 0)
+        if quota is None:
+            quota = int(recorded.get('x-requests-remaining') or REPLAY_QUOTA)
+        self.requests_remaining = quota
+
+        self.requests = 0
+        self.errors = 0
+        self.step = 0
+        self.started = time.monotonic()
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies = {}  # (sport, markets, from, to, event ids) -> body for the current step
+
+    @staticmethod
+    def _load(fixture_dir):
+        with open(os.path.join(fixture_dir, SPORTS_FILE), 'r', encoding='utf-8') as f:
+            sports = json.load(f)
+
+        events = {}
+        for name in sorted(os.listdir(fixture_dir)):
+            if name.endswith('.json') and name not in (SPORTS_FILE, HEADERS_FILE):
+                with open(os.path.join(fixture_dir, name), 'r', encoding='utf-8') as f:
+                    events[name[:-len('.json')]] = json.load(f)
+
+        recorded = {}
+        headers_path = os.path.join(fixture_dir, HEADERS_FILE)
+        if os.path.exists(headers_path):
+            with open(headers_path, 'r', encoding='utf-8') as f:
+                recorded = json.load(f)
+
+        if not events:
+            raise ValueError(f"No odds fixtures in {fixture_dir}")
+
+        logger.info(f"Loaded {sum(len(slate) for slate in events.values())} events for {sorted(events)} from {fixture_dir}")
+        return sports, events, recorded
+
+    def delay(self):
+        """Seconds to hold the next response"""
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._rng.uniform(0, self.jitter)
+
+    def inject_error(self):
+        """Status of an injected error for the next request, or None"""
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors += 1
+                return self._rng.choice(ERROR_STATUSES)
+        return None
+
+    def _advance(self):
+        """Apply the drift steps due since the last request; call with the lock held"""
+        if not self.drift:
+            return
+
+        due = int((time.monotonic() - self.started) / self.drift_interval)
+        if due <= self.step:
+            return
+
+        # A long idle period only needs enough steps to look like a moved market
+        for _ in range(min(due - self.step, 10)):
+            self._drift_prices()
+        self.step = due
+        self._bodies.clear()
+
+    def _drift_prices(self):
+        rng = self._rng
+        now = format_timestamp(datetime.now(timezone.utc))
+
+        for slate in self.events.values():
+            for event in slate:
+                for bookmaker in event.get('bookmakers', []):
+                    moved = False
+                    for market in bookmaker.get('markets', []):
+                        for outcome in market.get('outcomes', []):
+                            if rng.random() < self.drift_share:
+                                price = outcome['price'] * math.exp(rng.gauss(0, self.drift))
+                                outcome['price'] = round(max(price, 1.01), 2)
+                                market['last_update'] = now
+                                moved = True
+                    if moved:
+                        bookmaker['last_update'] = now
+
+    def sports_body(self):
+        return json.dumps(self.sports).encode('utf-8')
+
+    def odds_body(self, sport, params):
+        """
+        The odds response for a sport, filtered like the API filters it
+
+        Returns:
+            bytes: JSON body, or None for an unknown sport
+        """
+        slate = self.events.get(sport)
+        if slate is None:
+            return None
+
+        markets = params.get('markets', MARKETS)
+        commence_from = params.get('commenceTimeFrom')
+        commence_to = params.get('commenceTimeTo')
+        event_ids = params.get('eventIds')
+        key = (sport, markets, commence_from, commence_to, event_ids)
+
+        with self._lock:
+            self._advance()
+
+            body = self._bodies.get(key)
+            if body is None:
+                wanted = {market.strip() for market in markets.split(',') if market.strip()}
+                ids = {event_id.strip() for event_id in event_ids.split(',')} if event_ids else None
+                events = []
+
+                for event in slate:
+                    # Timestamps share the API's fixed-width format, so they compare as strings
+                    if commence_from and event['commence_time'] < commence_from:
+                        continue
+                    if commence_to and event['commence_time'] > commence_to:
+                        continue
+                    if ids is not None and event['id'] not in ids:
+                        continue
+
+                    bookmakers = []
+                    for bookmaker in event.get('bookmakers', []):
+                        book_markets = [market for market in bookmaker.get('markets', []) if market['key'] in wanted]
+                        if book_markets:
+                            bookmakers.append({**bookmaker, 'markets': book_markets})
+                    events.append({**event, 'bookmakers': bookmakers})
+
+                body = self._bodies[key] = json.dumps(events).encode('utf-8')
+
+        return body
+
+    def charge(self, cost):
+        """
+        Spend quota for a request
+
+        Returns:
+            dict: Quota headers for the response, or None when the quota is used up
+        """
+        with self._lock:
+            if cost > self.requests_remaining:
+                return None
+            self.requests_remaining -= cost
+            self.requests_used += cost
+            return {
+                'x-requests-remaining': str(self.requests_remaining),
+                'x-requests-used': str(self.requests_used),
+                'x-requests-last': str(cost),
+            }
+
+    def quota_headers(self):
+        with self._lock:
+            return {
+                'x-requests-remaining': str(self.requests_remaining),
+                'x-requests-used': str(self.requests_used),
+            }
+
+def request_cost(params):
+    """Quota cost of an odds request: regions times markets, as the API charges"""
+    regions = [region for region in params.get('regions', REGIONS).split(',') if region.strip()]
+    markets = [market for market in params.get('markets', MARKETS).split(',') if market.strip()]
+    return max(1, len(regions)) * max(1, len(markets))
+
+class ReplayRequestHandler(BaseHTTPRequestHandler):
+    """Answers /v4/sports and /v4/sports/<sport>/odds like the Odds API"""
+
+    server_version = "MLBOddsReplay/0.1"
+    # Keep connections open so pooled clients are exercised as against the real API
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        replay = self.server.replay
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+
+        delay = replay.delay()
+        if delay:
+            time.sleep(delay)
+
+        if not (params.get('apiKey') or params.get('api_key')):
+            self._send_json(401, {'message': "API key is missing"})
+            return
+
+        status = replay.inject_error()
+        if status is not None:
+            self._send_json(status, {'message': f"Injected error {status}"})
+            return
+
+        if parts == ['v4', 'sports']:
+            self._send_body(200, replay.sports_body(), replay.quota_headers())
+        elif len(parts) == 4 and parts[:2] == ['v4', 'sports'] and parts[3] == 'odds':
+            body = replay.odds_body(parts[2], params)
+            if body is None:
+                self._send_json(404, {'message': f"Unknown sport {parts[2]}"})
+                return
+
+            headers = replay.charge(request_cost(params))
+            if headers is None:
+                self._send_json(401, {'message': "Usage quota has been reached"}, replay.quota_headers())
+                return
+
+            self._send_body(200, body, headers)
+        else:
+            self._send_json(404, {'message': f"Unknown path {url.path}"})
+
+    def _send_json(self, status, data, headers=None):
+        self._send_body(status, json.dumps(data).encode('utf-8'), headers)
+
+    def _send_body(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+def create_server(fixture_dir=REPLAY_DIR, host=SERVER_HOST, port=REPLAY_PORT, **replay_options):
+    """
+    A replay server, not yet serving; port 0 picks a free port
+
+    Args:
+        fixture_dir (str): Directory of recorded responses
+        host (str): Interface to listen on
+        port (int): Port to listen on
+        **replay_options: Passed to FixtureReplay (latency, jitter, error_rate, drift, ...)
+
+    Returns:
+        ThreadingHTTPServer: Server with the FixtureReplay as .replay
+    """
+    server = ThreadingHTTPServer((host, port), ReplayRequestHandler)
+    server.daemon_threads = True
+    server.replay = FixtureReplay(fixture_dir, **replay_options)
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Odds API responses locally")
+    parser.add_argument("--fixtures", type=str, default=REPLAY_DIR, help="Directory of recorded responses (default: %(default)s)")
+    parser.add_argument("--record", type=str, help="Comma separated sport keys to record from the real API into --fixtures, then exit")
+    parser.add_argument("--port", type=int, default=REPLAY_PORT, help="Port to listen on (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more random seconds per response (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 429, 500 or 503 (default: 0)")
+    parser.add_argument("--drift", type=float, default=0.0, help="Standard deviation of each log price step, e.g. 0.02 (default: 0, prices never move)")
+    parser.add_argument("--drift-interval", type=float, default=60.0, help="Seconds between price steps (default: %(default)s)")
+    parser.add_argument("--drift-share", type=float, default=0.2, help="Share of prices moving on each step (default: %(default)s)")
+    parser.add_argument("--quota", type=int, help="Requests remaining at start (default: the recorded quota)")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible drift and errors")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.record:
+        from .api_client import OddsApiClient
+
+        sports = [sport.strip() for sport in args.record.split(",") if sport.strip()]
+        with OddsApiClient() as client:
+            record(client, sports, args.fixtures)
+        return
+
+    server = create_server(
+        args.fixtures,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        drift=args.drift,
+        drift_interval=args.drift_interval,
+        drift_share=args.drift_share,
+        quota=args.quota,
+        seed=args.seed
+    )
+
+    host, port = server.server_address[:2]
+    logger.info(f"Replaying {args.fixtures} on http://{host}:{port}/v4 (set ODDS_API_BASE_URL or pass --base-url)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping replay server")
+    finally:
+        replay = server.replay
+        logger.info(
+            f"Served {replay.requests} requests ({replay.errors} injected errors), "
+            f"{replay.requests_remaining} quota remaining"
+        )
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote, urlsplit
+from .arbitrage import ArbitrageCalculator
+from .calculator import EVCalculator
+from .config import SERVER_HOST, SERVER_PORT, SERVER_STALE_POLLS
+from .metrics import metrics
+from .poller import OddsPoller
+
+logger = logging.getLogger(__name__)
+
+class Payload:
+    """A JSON response body with its ETag, built once and served to every client"""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, data):
+        self.body = json.dumps(data).encode('utf-8')
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+class OddsService:
+    """
+    One shared slate, refreshed by a single poller, with every response precomputed
+
+    Each poll that changes a price rebuilds the /games, /arbitrage and /value
+    bodies once; clients only ever read them, so any number of clients costs
+    one upstream request per refresh.
+    """
+
+    def __init__(self, poller, bankroll=100, min_return=0.0, min_odds=1.5, max_odds=10.0, devig='multiplicative',
+                 stale_polls=SERVER_STALE_POLLS):
+        """
+        Args:
+            poller (OddsPoller): Poller whose updates feed the service; its on_update is replaced
+            bankroll (float): Total stake used to size arbitrage opportunities
+            min_return (float): Minimum guaranteed arbitrage return in percent
+            min_odds (float): Minimum odds to consider for value bets
+            max_odds (float): Maximum odds to consider for value bets
+            devig (str): How the margin is removed from consensus probabilities
+            stale_polls (int): Poll intervals without a successful poll after which responses are refused as stale
+        """
+        self.poller = poller
+        self.bankroll = bankroll
+        self.min_return = min_return
+        self.min_odds = min_odds
+        self.max_odds = max_odds
+        self.devig = devig
+        self.stale_polls = stale_polls
+
+        self._lock = threading.Lock()
+        self._games = []
+        self._payloads = {}
+        self._teams = {}  # lower-cased team query -> Payload, for the current slate
+        self.updated_at = None
+
+        poller.on_update = self.refresh
+
+    def refresh(self, games, changes=None):
+        """Rebuild every precomputed response from a new slate"""
+        from .batch import BatchEVCalculator
+
+        with metrics.stage('calculate'):
+            arbitrage = ArbitrageCalculator.find_arbitrage(games, bankroll=self.bankroll, min_return=self.min_return)
+            value_bets = BatchEVCalculator.find_best_value_bets(
+                games,
+                min_odds=self.min_odds,
+                max_odds=self.max_odds,
+                devig=self.devig
+            )
+        updated_at = self.poller.last_poll.isoformat() if self.poller.last_poll else None
+
+        with metrics.stage('render'):
+            payloads = {
+                '/games': Payload({'updated_at': updated_at, 'games': [game.to_dict() for game in games]}),
+                '/arbitrage': Payload({'updated_at': updated_at, 'opportunities': arbitrage}),
+                '/value': Payload({'updated_at': updated_at, 'value_bets': value_bets}),
+            }
+
+        with self._lock:
+            self._games = list(games)
+            self._payloads = payloads
+            self._teams = {}
+            self.updated_at = updated_at
+
+        logger.info(f"Refreshed responses for {len(games)} games")
+
+    def get(self, path):
+        """
+        The response for a path
+
+        Returns:
+            Payload: The response, or None for an unknown path or team
+        """
+        with self._lock:
+            payload = self._payloads.get(path)
+            if payload is not None or not path.startswith('/team/'):
+                return payload
+
+            query = unquote(path[len('/team/'):]).lower()
+            payload = self._teams.get(query)
+            if payload is None:
+                payload = self._team_payload(query)
+                if payload is not None:
+                    self._teams[query] = payload
+            return payload
+
+    def _team_payload(self, query):
+        """All odds for every game of the team matching a query, like --team"""
+        games = []
+
+        for game in self._games:
+            if query in game.home_team.lower():
+                team = game.home_team
+            elif query in game.away_team.lower():
+                team = game.away_team
+            else:
+                continue
+
+            odds = []
+            for odds_data in game.get_all_odds(team):
+                implied_prob = EVCalculator.implied_probability(odds_data['odds'])
+                odds.append({
+                    'bookmaker': odds_data['bookmaker'],
+                    'odds': odds_data['odds'],
+                    'implied_probability': implied_prob,
+                    'ev': EVCalculator.calculate_ev(implied_prob, odds_data['odds'])
+                })
+
+            games.append({'game': str(game), 'game_id': game.game_id, 'team': team, 'odds': odds})
+
+        if not games:
+            return None
+
+        return Payload({'updated_at': self.updated_at, 'games': games})
+
+    @property
+    def ready(self):
+        """Whether a slate has been loaded yet"""
+        return bool(self._payloads)
+
+    @property
+    def stale(self):
+        """Whether polling has failed for longer than stale_polls poll intervals"""
+        last_success = self.poller.last_success
+        if last_success is None:
+            return False
+
+        max_age = self.stale_polls * (self.poller.interval or self.poller.max_interval)
+        return (datetime.now(timezone.utc) - last_success).total_seconds() > max_age
+
+class OddsRequestHandler(BaseHTTPRequestHandler):
+    """Serves an OddsService's precomputed responses with ETag revalidation"""
+
+    server_version = "MLBOdds/0.1"
+
+    def do_GET(self):
+        service = self.server.service
+        path = urlsplit(self.path).path.rstrip('/') or '/'
+
+        if path == '/metrics':
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if not service.ready:
+            self._send_error(503, "No odds loaded yet")
+            return
+
+        if service.stale:
+            self._send_error(503, f"Odds are stale, last polled successfully at {service.poller.last_success.isoformat()}")
+            return
+
+        payload = service.get(path)
+        if payload is None:
+            self._send_error(404, f"Unknown path {path}")
+            return
+
+        if payload.etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', payload.etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload.body)))
+        self.send_header('ETag', payload.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(payload.body)
+
+    def _send_error(self, status, message):
+        body = json.dumps({'error': message}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+def serve(client, sports, regions, markets, host=SERVER_HOST, port=SERVER_PORT, max_workers=None, **service_options):
+    """
+    Poll in the background and serve the results until interrupted
+
+    Args:
+        client (OddsApiClient): Client used by the poller
+        sports (list): Sport keys to poll
+        regions (list): Region keys to poll
+        markets (str): Comma separated market keys
+        host (str): Interface to listen on
+        port (int): Port to listen on
+        max_workers (int): Maximum simultaneous requests per poll, None for the default
+        **service_options: Passed to OddsService (bankroll, min_return, min_odds, max_odds, devig)
+    """
+    poller_options = {'max_workers': max_workers} if max_workers else {}
+    poller = OddsPoller(client, sports, regions, markets=markets, **poller_options)
+    service = OddsService(poller, **service_options)
+
+    server = ThreadingHTTPServer((host, port), OddsRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    metrics.enable()
+
+    poll_thread = threading.Thread(target=poller.run, name="odds-poller", daemon=True)
+    poll_thread.start()
+
+    logger.info(f"Serving /games, /arbitrage, /value, /team/<name> and /metrics on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping server")
+    finally:
+        poller.stop()
+        server.server_close()
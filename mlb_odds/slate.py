@@ -0,0 +1,223 @@
+from .models import GameOdds, Bookmaker, parse_timestamp
+
+def _outcomes_by_key(bookmaker):
+    """Map (market, outcome name, point) to Outcome for one bookmaker"""
+    return {
+        (market.market_type, outcome.name, outcome.point): outcome
+        for market in bookmaker.markets
+        for outcome in market.outcomes
+    }
+
+def _price_change(game_id, bookmaker, key, old_price, new_price):
+    market, outcome, point = key
+    return {
+        'game_id': game_id,
+        'bookmaker': bookmaker.key,
+        'bookmaker_title': bookmaker.title,
+        'market': market,
+        'outcome': outcome,
+        'point': point,
+        'old_price': old_price,
+        'new_price': new_price,
+    }
+
+class Slate:
+    """
+    In-memory set of games kept up to date from successive API payloads
+
+    Applying a payload only touches bookmakers whose last_update moved forward
+    and returns the individual price changes, so downstream analysis can work
+    on what changed instead of the whole slate.
+
+    Each change is a dict with game_id, bookmaker (key), bookmaker_title,
+    market, outcome, point, old_price and new_price. A price that appears for
+    the first time has an old_price of None; one that disappears (including
+    every price of a bookmaker or game that dropped off the board) has a
+    new_price of None.
+    """
+
+    def __init__(self, games=None):
+        self._games = {}
+        for game in games or []:
+            self._games[game.game_id] = game
+
+    @property
+    def games(self):
+        """Games currently on the slate"""
+        return list(self._games.values())
+
+    def get(self, game_id):
+        """Get a game by id, or None"""
+        return self._games.get(game_id)
+
+    def __len__(self):
+        return len(self._games)
+
+    def apply(self, payload, remove_missing=True):
+        """
+        Apply raw API events (e.g. a get_odds response or an iter_events stream)
+
+        Bookmakers whose last_update has not moved are skipped without building
+        any model objects.
+
+        Args:
+            payload (iterable): Event dicts in the API format
+            remove_missing (bool): Drop games that are not in the payload
+
+        Returns:
+            list: Price changes
+        """
+        changes = []
+        seen = set()
+
+        for event in payload:
+            game_id = event.get('id')
+            seen.add(game_id)
+            game = self._games.get(game_id)
+
+            if game is None:
+                game = GameOdds.from_api(event)
+                self._games[game_id] = game
+                changes.extend(self._all_prices(game, new=True))
+                continue
+
+            current = {bookmaker.key: bookmaker for bookmaker in game.bookmakers}
+            changed = False
+
+            for bm_data in event.get('bookmakers', []):
+                bookmaker = current.get(bm_data.get('key'))
+                if bookmaker is not None and parse_timestamp(bm_data.get('last_update')) <= bookmaker.last_update:
+                    continue
+
+                changed |= self._merge_bookmaker(game, bookmaker, Bookmaker.from_api(bm_data), changes)
+
+            incoming_keys = {bm_data.get('key') for bm_data in event.get('bookmakers', [])}
+            changed |= self._remove_bookmakers(game, incoming_keys, changes)
+
+            if changed:
+                game.invalidate_index()
+
+        if remove_missing:
+            changes.extend(self._remove_missing(seen))
+
+        return changes
+
+    def apply_games(self, games, remove_missing=True):
+        """
+        Apply already parsed games (e.g. from OddsApiClient.get_odds_many)
+
+        Args:
+            games (list): GameOdds objects
+            remove_missing (bool): Drop games that are not in the list
+
+        Returns:
+            list: Price changes
+        """
+        changes = []
+        seen = set()
+
+        for incoming in games:
+            seen.add(incoming.game_id)
+            game = self._games.get(incoming.game_id)
+
+            if game is None:
+                self._games[incoming.game_id] = incoming
+                changes.extend(self._all_prices(incoming, new=True))
+                continue
+
+            current = {bookmaker.key: bookmaker for bookmaker in game.bookmakers}
+            changed = False
+
+            for bookmaker in incoming.bookmakers:
+                existing = current.get(bookmaker.key)
+                if existing is not None and bookmaker.last_update <= existing.last_update:
+                    continue
+
+                changed |= self._merge_bookmaker(game, existing, bookmaker, changes)
+
+            changed |= self._remove_bookmakers(game, {bookmaker.key for bookmaker in incoming.bookmakers}, changes)
+
+            if changed:
+                game.invalidate_index()
+
+        if remove_missing:
+            changes.extend(self._remove_missing(seen))
+
+        return changes
+
+    def _merge_bookmaker(self, game, current, incoming, changes):
+        """
+        Merge a newer copy of a bookmaker into a game
+
+        Prices are updated in place on the existing Outcome objects; the
+        bookmaker's markets are only replaced when outcomes appear or disappear.
+
+        Returns:
+            bool: True if any price changed
+        """
+        if current is None:
+            game.bookmakers.append(incoming)
+            new_changes = [
+                _price_change(game.game_id, incoming, key, None, outcome.price)
+                for key, outcome in _outcomes_by_key(incoming).items()
+            ]
+            changes.extend(new_changes)
+            return bool(new_changes)
+
+        old = _outcomes_by_key(current)
+        new = _outcomes_by_key(incoming)
+        count = len(changes)
+
+        for key, outcome in new.items():
+            previous = old.get(key)
+            if previous is None:
+                changes.append(_price_change(game.game_id, current, key, None, outcome.price))
+            elif previous.price != outcome.price:
+                changes.append(_price_change(game.game_id, current, key, previous.price, outcome.price))
+                previous.price = outcome.price
+
+        removed = [key for key in old if key not in new]
+        for key in removed:
+            changes.append(_price_change(game.game_id, current, key, old[key].price, None))
+
+        if removed or len(new) != len(old):
+            current.markets = incoming.markets
+        current.last_update = incoming.last_update
+
+        return len(changes) > count
+
+    def _remove_bookmakers(self, game, incoming_keys, changes):
+        """
+        Drop the bookmakers of a game that are no longer listed for it
+
+        Returns:
+            bool: True if any bookmaker was removed
+        """
+        dropped = [bookmaker for bookmaker in game.bookmakers if bookmaker.key not in incoming_keys]
+        if not dropped:
+            return False
+
+        for bookmaker in dropped:
+            for key, outcome in _outcomes_by_key(bookmaker).items():
+                changes.append(_price_change(game.game_id, bookmaker, key, outcome.price, None))
+
+        game.bookmakers = [bookmaker for bookmaker in game.bookmakers if bookmaker.key in incoming_keys]
+        return True
+
+    def _all_prices(self, game, new):
+        """Changes adding (or removing) every price of a game"""
+        for bookmaker in game.bookmakers:
+            for key, outcome in _outcomes_by_key(bookmaker).items():
+                if new:
+                    yield _price_change(game.game_id, bookmaker, key, None, outcome.price)
+                else:
+                    yield _price_change(game.game_id, bookmaker, key, outcome.price, None)
+
+    def _remove_missing(self, seen):
+        """Drop games that are no longer listed and report their prices as removed"""
+        changes = []
+
+        for game_id in [game_id for game_id in self._games if game_id not in seen]:
+            changes.extend(self._all_prices(self._games.pop(game_id), new=False))
+
+        return changes
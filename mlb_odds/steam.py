@@ -0,0 +1,205 @@
+from array import array
+from datetime import datetime, timezone
+from .config import STEAM_WINDOW, STEAM_MIN_BOOKS, STEAM_MIN_MOVE, STEAM_HISTORY
+
+class PriceBuffer:
+    """
+    Fixed-size ring buffer of (timestamp, price) points
+
+    Points are packed as pairs of doubles in one preallocated array, so a
+    buffer costs a few hundred bytes however long it lives.
+    """
+
+    __slots__ = ('_data', '_next', '_count')
+
+    def __init__(self, size):
+        self._data = array('d', bytes(16 * size))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, price):
+        """Add a point, overwriting the oldest once full"""
+        size = len(self._data) // 2
+        self._data[2 * self._next] = timestamp.timestamp()
+        self._data[2 * self._next + 1] = price
+        self._next = (self._next + 1) % size
+        self._count = min(self._count + 1, size)
+
+    def last_price(self):
+        return self._data[2 * (self._next - 1) + 1] if self._next else self._data[-1]
+
+    def __iter__(self):
+        """Points oldest first, as (datetime, price)"""
+        size = len(self._data) // 2
+        for i in range(self._next - self._count, self._next):
+            i %= size
+            yield datetime.fromtimestamp(self._data[2 * i], tz=timezone.utc), self._data[2 * i + 1]
+
+class SteamDetector:
+    """
+    Line movement tracker flagging coordinated moves across bookmakers
+
+    Every (game, bookmaker, market, outcome, point) keeps a fixed-size ring
+    buffer of its recent (timestamp, price) points, fed from Slate change sets.
+    When enough books move the same outcome the same way within the window,
+    the outcome is flagged as steam, together with the stale books that have
+    not followed yet and may still offer the old price.
+
+    Each price change costs O(1); only outcomes that moved are re-evaluated,
+    in time bounded by the number of books pricing them. Memory is bounded by
+    the prices currently on the slate: removed prices and games release their
+    buffers.
+    """
+
+    def __init__(self, window=STEAM_WINDOW, min_books=STEAM_MIN_BOOKS, min_move=STEAM_MIN_MOVE, history=STEAM_HISTORY):
+        """
+        Args:
+            window (float): Seconds within which moves count as coordinated
+            min_books (int): Books that must move the same way to flag steam
+            min_move (float): Smallest relative price change counted as a move, e.g. 0.02 for 2%
+            history (int): Points kept per bookmaker and outcome
+        """
+        self.window = window
+        self.min_books = min_books
+        self.min_move = min_move
+        self.history = history
+
+        self._books = {}  # (game_id, market, outcome, point) -> {bookmaker: PriceBuffer}
+        self._moves = {}  # outcome key -> {bookmaker: (timestamp, old price, new price) of its latest move}
+        self._flagged = {}  # outcome key -> (direction, books) last reported
+        self._titles = {}  # bookmaker key -> title
+
+    def __len__(self):
+        """Number of price buffers held"""
+        return sum(len(books) for books in self._books.values())
+
+    def prices(self, game_id, bookmaker, market, outcome, point=None):
+        """Recent (timestamp, price) points of one bookmaker's price, oldest first"""
+        buffer = self._books.get((game_id, market, outcome, point), {}).get(bookmaker)
+        return list(buffer) if buffer else []
+
+    def apply_changes(self, changes, timestamp):
+        """
+        Record a Slate change set and report new steam
+
+        Args:
+            changes (list): Price changes returned by Slate.apply / apply_games
+            timestamp (datetime): When the prices were fetched (e.g. OddsPoller.last_poll)
+
+        Returns:
+            list: Steam signals, strongest first (see _evaluate)
+        """
+        touched = set()
+
+        for change in changes:
+            key = (change['game_id'], change['market'], change['outcome'], change['point'])
+            bookmaker = change['bookmaker']
+            self._titles[bookmaker] = change['bookmaker_title']
+
+            if change['new_price'] is None:
+                self._remove(key, bookmaker)
+                continue
+
+            books = self._books.get(key)
+            if books is None:
+                books = self._books[key] = {}
+            buffer = books.get(bookmaker)
+            if buffer is None:
+                buffer = books[bookmaker] = PriceBuffer(self.history)
+            buffer.append(timestamp, change['new_price'])
+
+            old_price = change['old_price']
+            if old_price and abs(change['new_price'] / old_price - 1) >= self.min_move:
+                moves = self._moves.get(key)
+                if moves is None:
+                    moves = self._moves[key] = {}
+                moves[bookmaker] = (timestamp, old_price, change['new_price'])
+                touched.add(key)
+
+        signals = []
+        for key in touched:
+            signal = self._evaluate(key, timestamp)
+            if signal is not None:
+                signals.append(signal)
+
+        signals.sort(key=lambda signal: (len(signal['moved']), abs(signal['average_move'])), reverse=True)
+        return signals
+
+    def _remove(self, key, bookmaker):
+        books = self._books.get(key)
+        if books is None:
+            return
+
+        books.pop(bookmaker, None)
+        self._moves.get(key, {}).pop(bookmaker, None)
+        if not books:
+            del self._books[key]
+            self._moves.pop(key, None)
+            self._flagged.pop(key, None)
+
+    def _evaluate(self, key, now):
+        """
+        Steam on one outcome, if enough books moved it the same way within the window
+
+        Returns:
+            dict: game_id, market, outcome, point, direction ('shortening' when prices
+                fell, 'drifting' when they rose), moved (bookmaker, title, old price,
+                new price, move) rows, average_move, and stale (bookmaker, title, price)
+                rows for the books that have not followed, furthest behind first; or None
+        """
+        latest = {}  # bookmaker -> (old price, new price) of its most recent move within the window
+        for bookmaker, (timestamp, old_price, new_price) in self._moves[key].items():
+            if (now - timestamp).total_seconds() <= self.window:
+                latest[bookmaker] = (old_price, new_price)
+
+        down = [bookmaker for bookmaker, (old_price, new_price) in latest.items() if new_price < old_price]
+        up = [bookmaker for bookmaker, (old_price, new_price) in latest.items() if new_price > old_price]
+        movers, direction = (down, 'shortening') if len(down) >= len(up) else (up, 'drifting')
+
+        if len(movers) < self.min_books:
+            self._flagged.pop(key, None)
+            return None
+
+        # Report each steam once, and again only when more books join it
+        flagged = self._flagged.get(key)
+        if flagged is not None and flagged[0] == direction and flagged[1] >= set(movers):
+            return None
+        self._flagged[key] = (direction, set(movers))
+
+        moved = []
+        for bookmaker in movers:
+            old_price, new_price = latest[bookmaker]
+            moved.append({
+                'bookmaker': bookmaker,
+                'title': self._titles.get(bookmaker, bookmaker),
+                'old_price': old_price,
+                'new_price': new_price,
+                'move': new_price / old_price - 1,
+            })
+        moved.sort(key=lambda row: row['move'], reverse=direction == 'drifting')
+
+        books = self._books[key]
+
+        stale = [
+            {'bookmaker': bookmaker, 'title': self._titles.get(bookmaker, bookmaker), 'price': buffer.last_price()}
+            for bookmaker, buffer in books.items()
+            if bookmaker not in latest
+        ]
+        # Stale books still sit on the old side of the move: highest prices first when
+        # it is shortening, lowest first when it is drifting
+        stale.sort(key=lambda row: row['price'], reverse=direction == 'shortening')
+
+        game_id, market, outcome, point = key
+        return {
+            'game_id': game_id,
+            'market': market,
+            'outcome': outcome,
+            'point': point,
+            'direction': direction,
+            'moved': moved,
+            'average_move': sum(row['move'] for row in moved) / len(moved),
+            'stale': stale,
+        }
@@ -0,0 +1,721 @@
+import itertools
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from .calculator import EVCalculator
+from .config import DB_PATH
+from .models import GameOdds, Bookmaker, Market, Outcome, intern_name
+
+logger = logging.getLogger(__name__)
+
+# Tables shipped in mlb_arbitrage.db; created here for fresh databases
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS odds (
+    id INTEGER NOT NULL,
+    sport VARCHAR,
+    team1 VARCHAR,
+    team2 VARCHAR,
+    team1_odds FLOAT,
+    team2_odds FLOAT,
+    source VARCHAR,
+    game_metadata JSON,
+    timestamp DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE TABLE IF NOT EXISTS arbitrage_opportunities (
+    id INTEGER NOT NULL,
+    sport VARCHAR,
+    game VARCHAR,
+    team1 VARCHAR,
+    team2 VARCHAR,
+    team1_odds FLOAT,
+    team2_odds FLOAT,
+    team1_source VARCHAR,
+    team2_source VARCHAR,
+    team1_ev FLOAT,
+    team2_ev FLOAT,
+    game_metadata JSON,
+    timestamp DATETIME,
+    PRIMARY KEY (id)
+);
+"""
+
+# Normalized line-movement history: one row per price per snapshot
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    sport TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    commence_time TEXT
+);
+CREATE TABLE IF NOT EXISTS bookmakers (
+    key TEXT PRIMARY KEY,
+    title TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    timestamp TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    game_id TEXT NOT NULL,
+    bookmaker TEXT NOT NULL,
+    market TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    point REAL,
+    timestamp TEXT NOT NULL,
+    price REAL NOT NULL,
+    last_seen TEXT  -- last snapshot of a compacted run of unchanged prices, NULL if just timestamp
+);
+CREATE TABLE IF NOT EXISTS price_daily (
+    game_id TEXT NOT NULL,
+    bookmaker TEXT NOT NULL,
+    market TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    point REAL,
+    day TEXT NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_price_daily_outcome
+    ON price_daily (game_id, market, outcome, bookmaker, point, day);
+CREATE INDEX IF NOT EXISTS idx_price_daily_day
+    ON price_daily (day);
+-- Covering indexes: point lookups by outcome and range scans by time never touch the table
+CREATE INDEX IF NOT EXISTS idx_price_history_outcome
+    ON price_history (game_id, market, outcome, bookmaker, point, timestamp, price);
+CREATE INDEX IF NOT EXISTS idx_price_history_timestamp
+    ON price_history (timestamp, game_id, bookmaker, market, outcome, point, price);
+"""
+
+# Created after migrate() so databases from before compaction have the column
+LAST_SEEN_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_price_history_last_seen
+    ON price_history (last_seen) WHERE last_seen IS NOT NULL
+"""
+
+UPSERT_GAME = """
+INSERT INTO games (game_id, sport, home_team, away_team, commence_time)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (game_id) DO UPDATE SET commence_time = excluded.commence_time
+"""
+
+UPSERT_BOOKMAKER = """
+INSERT INTO bookmakers (key, title) VALUES (?, ?)
+ON CONFLICT (key) DO UPDATE SET title = excluded.title
+"""
+
+INSERT_PRICE = """
+INSERT INTO price_history (game_id, bookmaker, market, outcome, point, timestamp, price)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_SNAPSHOT = """
+INSERT OR IGNORE INTO snapshots (timestamp) VALUES (?)
+"""
+
+INSERT_DAILY = """
+INSERT INTO price_daily (game_id, bookmaker, market, outcome, point, day, open, high, low, close, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_ODDS = """
+INSERT INTO odds (sport, team1, team2, team1_odds, team2_odds, source, game_metadata, timestamp)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_ARBITRAGE = """
+INSERT INTO arbitrage_opportunities (
+    sport, game, team1, team2, team1_odds, team2_odds, team1_source, team2_source,
+    team1_ev, team2_ev, game_metadata, timestamp
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def format_timestamp(value):
+    """Format a datetime the way the DATETIME columns store it (naive UTC)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+def build_game(game, bookmaker_titles, rows, last_update):
+    """
+    Rebuild a GameOdds from stored prices
+
+    Args:
+        game (tuple): (game_id, sport, home_team, away_team, commence_time) from the games table
+        bookmaker_titles (dict): Bookmaker key -> title
+        rows (iterable): (bookmaker, market, outcome, point, price) ordered by bookmaker and market
+        last_update (datetime): Last update time given to every bookmaker
+
+    Returns:
+        GameOdds: The game as it was quoted in the snapshot
+    """
+    game_id, sport, home_team, away_team, commence_time = game
+    game_odds = GameOdds(game_id, sport, commence_time, home_team, away_team)
+
+    for key, book_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        bookmaker = Bookmaker(key, bookmaker_titles.get(key, key), last_update)
+        for market_type, market_rows in itertools.groupby(book_rows, key=lambda row: row[1]):
+            market = Market(market_type)
+            for _, _, name, point, price in market_rows:
+                market.outcomes.append(Outcome(intern_name(name), price, point))
+            bookmaker.markets.append(market)
+        game_odds.bookmakers.append(bookmaker)
+
+    game_odds._build_index()
+    return game_odds
+
+def connect(db_path=DB_PATH):
+    """
+    Open the database in WAL mode
+
+    WAL lets readers (history queries, other processes) keep reading while a
+    snapshot is being written.
+    """
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+class OddsStore:
+    """Writes odds snapshots and arbitrage opportunities to mlb_arbitrage.db"""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.connection = connect(db_path)
+        self.connection.executescript(SCHEMA)
+        self.connection.executescript(HISTORY_SCHEMA)
+        self.migrate()
+        self.connection.execute(LAST_SEEN_INDEX)
+
+    def migrate(self):
+        """Bring a price_history table from before compaction up to date"""
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(price_history)")]
+        if 'last_seen' in columns:
+            return
+
+        logger.info("Adding last_seen to price_history and backfilling snapshots")
+        with self.connection:
+            self.connection.execute("ALTER TABLE price_history ADD COLUMN last_seen TEXT")
+            self.connection.execute("INSERT OR IGNORE INTO snapshots SELECT DISTINCT timestamp FROM price_history")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def odds_rows(games, timestamp):
+        """One odds row per game and bookmaker with h2h prices (team1 is the home team)"""
+        for game in games:
+            for bookmaker in game.bookmakers:
+                for market in bookmaker.markets:
+                    if market.market_type != 'h2h':
+                        continue
+
+                    prices = {outcome.name: outcome.price for outcome in market.outcomes}
+                    metadata = {
+                        'game_id': game.game_id,
+                        'commence_time': game.commence_time.isoformat(),
+                        'bookmaker': bookmaker.key,
+                        'last_update': bookmaker.last_update.isoformat(),
+                    }
+
+                    yield (
+                        game.sport,
+                        game.home_team,
+                        game.away_team,
+                        prices.get(game.home_team),
+                        prices.get(game.away_team),
+                        bookmaker.title,
+                        json.dumps(metadata),
+                        timestamp,
+                    )
+
+    @staticmethod
+    def price_rows(games, timestamp):
+        """One price_history row per outcome of every market"""
+        for game in games:
+            for bookmaker in game.bookmakers:
+                for market in bookmaker.markets:
+                    for outcome in market.outcomes:
+                        yield (
+                            game.game_id,
+                            bookmaker.key,
+                            market.market_type,
+                            outcome.name,
+                            outcome.point,
+                            timestamp,
+                            outcome.price,
+                        )
+
+    @staticmethod
+    def arbitrage_rows(games, opportunities, timestamp):
+        """One row per opportunity from EVCalculator.find_arbitrage_opportunities"""
+        games_by_label = {str(game): game for game in games}
+
+        for opp in opportunities:
+            game = games_by_label.get(opp['game'])
+            metadata = {
+                'game_id': game.game_id if game else None,
+                'commence_time': game.commence_time.isoformat() if game else None,
+                'home_true_probability': opp['home_team']['true_probability'],
+                'away_true_probability': opp['away_team']['true_probability'],
+            }
+
+            yield (
+                game.sport if game else None,
+                opp['game'],
+                opp['home_team']['name'],
+                opp['away_team']['name'],
+                opp['home_team']['best_odds'],
+                opp['away_team']['best_odds'],
+                opp['home_team']['bookmaker'],
+                opp['away_team']['bookmaker'],
+                opp['home_team']['ev'],
+                opp['away_team']['ev'],
+                json.dumps(metadata),
+                timestamp,
+            )
+
+    def save_snapshot(self, games, opportunities=None, timestamp=None):
+        """
+        Write a poll's games and arbitrage opportunities in one transaction
+
+        Args:
+            games (list): GameOdds objects
+            opportunities (list): Output of EVCalculator.find_arbitrage_opportunities,
+                computed from games if None
+            timestamp (datetime): Snapshot time, now if None
+
+        Returns:
+            tuple: (odds rows written, opportunity rows written)
+        """
+        timestamp = format_timestamp(timestamp or datetime.now(timezone.utc))
+        if opportunities is None:
+            opportunities = EVCalculator.find_arbitrage_opportunities(games)
+
+        odds_rows = list(self.odds_rows(games, timestamp))
+        arbitrage_rows = list(self.arbitrage_rows(games, opportunities, timestamp))
+        price_rows = list(self.price_rows(games, timestamp))
+        game_rows = [
+            (game.game_id, game.sport, game.home_team, game.away_team, format_timestamp(game.commence_time))
+            for game in games
+        ]
+        bookmaker_rows = list({
+            bookmaker.key: (bookmaker.key, bookmaker.title)
+            for game in games
+            for bookmaker in game.bookmakers
+        }.values())
+
+        with self.connection:
+            self.connection.executemany(INSERT_ODDS, odds_rows)
+            self.connection.executemany(INSERT_ARBITRAGE, arbitrage_rows)
+            self.connection.executemany(UPSERT_GAME, game_rows)
+            self.connection.executemany(UPSERT_BOOKMAKER, bookmaker_rows)
+            self.connection.executemany(INSERT_PRICE, price_rows)
+            self.connection.execute(INSERT_SNAPSHOT, (timestamp,))
+
+        logger.info(
+            f"Stored {len(odds_rows)} odds rows, {len(price_rows)} prices "
+            f"and {len(arbitrage_rows)} arbitrage opportunities"
+        )
+
+        return len(odds_rows), len(arbitrage_rows)
+
+    def find_games(self, team):
+        """
+        Find stored games involving a team
+
+        Args:
+            team (str): Case-insensitive part of a team name
+
+        Returns:
+            list: (game_id, team name, home_team, away_team, commence_time) for each match
+        """
+        pattern = f"%{team}%"
+        rows = self.connection.execute(
+            "SELECT game_id, home_team, away_team, commence_time FROM games "
+            "WHERE home_team LIKE ? OR away_team LIKE ?",
+            (pattern, pattern)
+        ).fetchall()
+
+        return [
+            (game_id, home if team.lower() in home.lower() else away, home, away, commence_time)
+            for game_id, home, away, commence_time in rows
+        ]
+
+    def resolve_bookmaker(self, bookmaker):
+        """Get the key of a bookmaker given its key or title (case-insensitive), or None"""
+        row = self.connection.execute(
+            "SELECT key FROM bookmakers WHERE lower(key) = lower(?) OR lower(title) = lower(?)",
+            (bookmaker, bookmaker)
+        ).fetchone()
+
+        return row[0] if row else None
+
+    def price_history(self, team, bookmaker=None, market='h2h', since=None, until=None):
+        """
+        Every price posted for a team
+
+        Each game is answered from the outcome index with a prefix lookup on
+        (game_id, market, outcome[, bookmaker]) and a timestamp range. Days
+        already downsampled by compact() contribute their open and close
+        prices from price_daily.
+
+        Args:
+            team (str): Case-insensitive part of a team name
+            bookmaker (str): Bookmaker key or title, None for every bookmaker
+            market (str): Market key
+            since (datetime): Earliest snapshot to include
+            until (datetime): Snapshots strictly before this are included
+
+        Returns:
+            list: Dicts with game, bookmaker, outcome, point, timestamp and price,
+                ordered by game, bookmaker and time
+        """
+        bookmaker_key = None
+        if bookmaker is not None:
+            bookmaker_key = self.resolve_bookmaker(bookmaker)
+            if bookmaker_key is None:
+                return []
+
+        since = format_timestamp(since) if since else ''
+        until = format_timestamp(until) if until else '9999'
+        titles = dict(self.connection.execute("SELECT key, title FROM bookmakers"))
+        history = []
+
+        for game_id, team_name, home, away, commence_time in self.find_games(team):
+            outcome_filter = "game_id = ? AND market = ? AND outcome = ?"
+            outcome_params = [game_id, market, team_name]
+
+            if bookmaker_key is not None:
+                outcome_filter += " AND bookmaker = ?"
+                outcome_params.append(bookmaker_key)
+
+            query = (
+                f"SELECT bookmaker, point, timestamp, price FROM price_history WHERE {outcome_filter} "
+                "AND timestamp >= ? AND timestamp < ? "
+                "UNION ALL "
+                f"SELECT bookmaker, point, first_seen, open FROM price_daily WHERE {outcome_filter} "
+                "AND first_seen >= ? AND first_seen < ? "
+                "UNION ALL "
+                f"SELECT bookmaker, point, last_seen, close FROM price_daily WHERE {outcome_filter} "
+                "AND last_seen > first_seen AND last_seen >= ? AND last_seen < ? "
+                "ORDER BY bookmaker, point, timestamp"
+            )
+            params = (outcome_params + [since, until]) * 3
+
+            for book, point, timestamp, price in self.connection.execute(query, params):
+                history.append({
+                    'game': f"{away} @ {home} ({commence_time[:16]})",
+                    'bookmaker': titles.get(book, book),
+                    'outcome': team_name,
+                    'point': point,
+                    'timestamp': timestamp,
+                    'price': price,
+                })
+
+        return history
+
+    def biggest_movers(self, since, market=None, limit=20):
+        """
+        Prices that moved the most since a point in time
+
+        Moves are measured in implied probability, so a move from 1.50 to 1.40
+        ranks above one from 5.0 to 5.5. Days already downsampled by compact()
+        contribute their open and close prices from price_daily.
+
+        Args:
+            since (datetime): Start of the window
+            market (str): Only this market, None for every market
+            limit (int): Maximum number of movers
+
+        Returns:
+            list: Dicts with game, bookmaker, market, outcome, point, open and close prices
+                and the implied probability move in percentage points, largest first
+        """
+        since = format_timestamp(since)
+        market_filter = " AND market = ?" if market is not None else ""
+        market_params = [market] if market is not None else []
+
+        # Compacted runs that started before the window hold its opening prices
+        query = (
+            "SELECT game_id, bookmaker, market, outcome, point, price, timestamp FROM price_history "
+            f"WHERE last_seen >= ? AND timestamp < ?{market_filter} "
+            "UNION ALL "
+            "SELECT game_id, bookmaker, market, outcome, point, price, timestamp FROM price_history "
+            f"WHERE timestamp >= ?{market_filter} "
+            "UNION ALL "
+            "SELECT game_id, bookmaker, market, outcome, point, open, first_seen FROM price_daily "
+            f"WHERE last_seen >= ?{market_filter} "
+            "UNION ALL "
+            "SELECT game_id, bookmaker, market, outcome, point, close, last_seen FROM price_daily "
+            f"WHERE last_seen >= ? AND last_seen > first_seen{market_filter} "
+            "ORDER BY timestamp"
+        )
+        params = [since, since] + market_params + ([since] + market_params) * 3
+
+        # First and last price of every outcome in the window
+        prices = {}
+        for game_id, book, market_key, outcome, point, price, _ in self.connection.execute(query, params):
+            key = (game_id, book, market_key, outcome, point)
+            first = prices.get(key)
+            prices[key] = (first[0] if first else price, price)
+
+        games = {
+            row[0]: row[1:]
+            for row in self.connection.execute("SELECT game_id, home_team, away_team, commence_time FROM games")
+        }
+        titles = dict(self.connection.execute("SELECT key, title FROM bookmakers"))
+        movers = []
+
+        for (game_id, book, market_key, outcome, point), (open_price, close_price) in prices.items():
+            if open_price == close_price:
+                continue
+
+            home, away, commence_time = games.get(game_id, (None, None, ''))
+            movers.append({
+                'game': f"{away} @ {home} ({commence_time[:16]})",
+                'bookmaker': titles.get(book, book),
+                'market': market_key,
+                'outcome': outcome,
+                'point': point,
+                'open': open_price,
+                'close': close_price,
+                'move': round((1 / close_price - 1 / open_price) * 100, 2),
+            })
+
+        movers.sort(key=lambda x: abs(x['move']), reverse=True)
+        return movers[:limit]
+
+    def latest_games(self, sports=None):
+        """
+        Rebuild the most recent stored snapshot
+
+        Once every snapshot has been downsampled by compact(), the closing
+        prices of the last downsampled snapshot are used instead.
+
+        Args:
+            sports (list): Only games of these sports, None for every sport
+
+        Returns:
+            tuple: (list of GameOdds, snapshot datetime in UTC), or ([], None) if nothing is stored
+        """
+        timestamp = self.connection.execute("SELECT MAX(timestamp) FROM snapshots").fetchone()[0]
+
+        if timestamp is not None:
+            # Prices posted in the snapshot plus compacted runs still live at it
+            rows = self.connection.execute(
+                "SELECT game_id, bookmaker, market, outcome, point, price FROM ("
+                "SELECT game_id, bookmaker, market, outcome, point, price FROM price_history WHERE timestamp = ? "
+                "UNION ALL "
+                "SELECT game_id, bookmaker, market, outcome, point, price FROM price_history "
+                "WHERE last_seen >= ? AND timestamp < ?"
+                ") ORDER BY game_id, bookmaker, market, outcome, point",
+                (timestamp, timestamp, timestamp)
+            )
+        else:
+            timestamp = self.connection.execute("SELECT MAX(last_seen) FROM price_daily").fetchone()[0]
+            if timestamp is None:
+                return [], None
+
+            # Daily rows last seen in the final downsampled snapshot closed on its prices
+            rows = self.connection.execute(
+                "SELECT game_id, bookmaker, market, outcome, point, close FROM price_daily WHERE last_seen = ? "
+                "ORDER BY game_id, bookmaker, market, outcome, point",
+                (timestamp,)
+            )
+
+        snapshot_time = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S.%f').replace(tzinfo=timezone.utc)
+
+        titles = dict(self.connection.execute("SELECT key, title FROM bookmakers"))
+        metadata = {
+            game_id: (game_id, intern_name(sport), intern_name(home), intern_name(away), commence_time)
+            for game_id, sport, home, away, commence_time in self.connection.execute(
+                "SELECT game_id, sport, home_team, away_team, commence_time FROM games"
+            )
+        }
+
+        games = []
+        for game_id, game_rows in itertools.groupby(rows, key=lambda row: row[0]):
+            game = metadata.get(game_id)
+            if game is None or (sports is not None and game[1] not in sports):
+                continue
+
+            commence_time = datetime.strptime(game[4], '%Y-%m-%d %H:%M:%S.%f').replace(tzinfo=timezone.utc)
+            game_rows = (row[1:] for row in game_rows)
+            games.append(build_game(game[:4] + (commence_time,), titles, game_rows, snapshot_time))
+
+        return games, snapshot_time
+
+    def downsample(self, cutoff):
+        """
+        Replace prices last seen before cutoff with daily open/high/low/close rows
+
+        Like merge_runs, a day is split at first pitch, so a game's closing
+        line survives as the close of its last pre-game row.
+
+        Args:
+            cutoff (str): Formatted timestamp; runs that are still live at or after it are kept
+
+        Returns:
+            int: Number of raw price rows replaced
+        """
+        rows = self.connection.execute(
+            "SELECT game_id, bookmaker, market, outcome, point, timestamp, price, "
+            "COALESCE(last_seen, timestamp) FROM price_history "
+            "WHERE COALESCE(last_seen, timestamp) < ? "
+            "ORDER BY game_id, market, outcome, bookmaker, point, timestamp",
+            (cutoff,)
+        )
+
+        commence_times = dict(self.connection.execute("SELECT game_id, commence_time FROM games"))
+        daily = []
+        current = None
+        replaced = 0
+
+        for game_id, book, market, outcome, point, timestamp, price, last_seen in rows:
+            key = (game_id, book, market, outcome, point, timestamp[:10], timestamp < commence_times.get(game_id, ''))
+            replaced += 1
+
+            if current is not None and current[0] == key:
+                _, open_price, high, low, _, first_seen, _ = current
+                current = (key, open_price, max(high, price), min(low, price), price, first_seen, last_seen)
+                continue
+
+            if current is not None:
+                daily.append(current[0][:6] + current[1:])
+            current = (key, price, price, price, price, timestamp, last_seen)
+
+        if current is not None:
+            daily.append(current[0][:6] + current[1:])
+
+        self.connection.executemany(INSERT_DAILY, daily)
+        self.connection.execute(
+            "DELETE FROM price_history WHERE COALESCE(last_seen, timestamp) < ?", (cutoff,)
+        )
+        self.connection.execute("DELETE FROM snapshots WHERE timestamp < ?", (cutoff,))
+
+        return replaced
+
+    def merge_runs(self):
+        """
+        Collapse consecutive snapshots of an unchanged price into one row
+
+        A run extends only over consecutive snapshots, so a price that was
+        pulled and later reposted stays two runs, and it is split at first
+        pitch so pre-game and live prices never share a row.
+
+        Returns:
+            int: Number of rows removed
+        """
+        snapshots = [row[0] for row in self.connection.execute("SELECT timestamp FROM snapshots ORDER BY timestamp")]
+        position = {timestamp: i for i, timestamp in enumerate(snapshots)}
+        commence_times = dict(self.connection.execute("SELECT game_id, commence_time FROM games"))
+
+        rows = self.connection.execute(
+            "SELECT rowid, game_id, bookmaker, market, outcome, point, timestamp, price, "
+            "COALESCE(last_seen, timestamp) FROM price_history "
+            "ORDER BY game_id, market, outcome, bookmaker, point, timestamp"
+        )
+
+        deletes = []
+        updates = []
+        run = None  # [rowid, key, price, pre-game, last seen, last seen as stored]
+
+        def close_run():
+            if run is not None and run[4] != run[5]:
+                updates.append((run[4], run[0]))
+
+        for rowid, game_id, book, market, outcome, point, timestamp, price, last_seen in rows:
+            key = (game_id, book, market, outcome, point)
+            pre_game = timestamp < commence_times.get(game_id, '')
+
+            if (
+                run is not None
+                and run[1] == key
+                and run[2] == price
+                and run[3] == pre_game
+                and timestamp in position
+                and run[4] in position
+                and position[timestamp] == position[run[4]] + 1
+            ):
+                run[4] = last_seen
+                deletes.append((rowid,))
+                continue
+
+            close_run()
+            run = [rowid, key, price, pre_game, last_seen, last_seen]
+
+        close_run()
+
+        self.connection.executemany("DELETE FROM price_history WHERE rowid = ?", deletes)
+        self.connection.executemany("UPDATE price_history SET last_seen = ? WHERE rowid = ?", updates)
+
+        return len(deletes)
+
+    def file_size(self):
+        """Bytes on disk, including any write-ahead log not yet checkpointed"""
+        wal_path = f"{self.db_path}-wal"
+        wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        return os.path.getsize(self.db_path) + wal_size
+
+    def compact(self, retain_days=None, now=None):
+        """
+        Shrink the price history and reclaim the freed space
+
+        Consecutive snapshots of an unchanged price become a single row
+        spanning timestamp to last_seen. With retain_days, prices older than
+        that many whole days are downsampled to price_daily and odds rows
+        from those days are deleted. The file is vacuumed afterwards.
+
+        Args:
+            retain_days (int): Days of full history to keep, None to keep everything
+            now (datetime): Current time, now if None
+
+        Returns:
+            dict: Rows downsampled, merged and deleted, and the file size before and after
+        """
+        # Fold the WAL into the main file first so both sizes count the same pages
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size_before = self.file_size()
+        stats = {'downsampled': 0, 'merged': 0, 'odds_deleted': 0}
+
+        with self.connection:
+            if retain_days is not None:
+                now = now or datetime.now(timezone.utc)
+                cutoff_day = (now.astimezone(timezone.utc) if now.tzinfo else now) - timedelta(days=retain_days)
+                cutoff = format_timestamp(datetime.combine(cutoff_day.date(), datetime.min.time()))
+
+                stats['downsampled'] = self.downsample(cutoff)
+                stats['odds_deleted'] = self.connection.execute(
+                    "DELETE FROM odds WHERE timestamp < ?", (cutoff,)
+                ).rowcount
+
+            stats['merged'] = self.merge_runs()
+
+        # VACUUM goes through the WAL too; checkpoint again so the file itself shrinks
+        self.connection.execute("VACUUM")
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        stats['bytes_before'] = size_before
+        stats['bytes_after'] = self.file_size()
+
+        logger.info(
+            f"Compacted {self.db_path}: merged {stats['merged']} unchanged prices, "
+            f"downsampled {stats['downsampled']} and deleted {stats['odds_deleted']} odds rows, "
+            f"{size_before} -> {stats['bytes_after']} bytes"
+        )
+
+        return stats
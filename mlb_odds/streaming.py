@@ -0,0 +1,76 @@
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+class StreamingParseError(ValueError):
+    """Raised when a streamed response is not a JSON array"""
+
+def iter_json_array(chunks, encoding='utf-8'):
+    """
+    Incrementally parse a top-level JSON array, yielding one element at a time
+
+    Only the element currently being decoded is held in memory, so callers can
+    start working on the first events before the rest of the response arrives.
+
+    Args:
+        chunks (iterable): Byte chunks of the response body
+        encoding (str): Text encoding of the body
+
+    Yields:
+        Decoded array elements
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    started = False
+    exhausted = False
+
+    while True:
+        # Skip whitespace and separators between elements
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+
+        if pos < len(buffer):
+            char = buffer[pos]
+
+            if not started:
+                if char != '[':
+                    raise StreamingParseError(f"Expected a JSON array, found {char!r}")
+                started = True
+                pos += 1
+                continue
+
+            if char == ']':
+                # Drain the rest of the body so pass-through consumers (e.g. the cache) see all of it
+                for _ in chunks:
+                    pass
+                return
+
+            if char == ',':
+                pos += 1
+                continue
+
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Most likely the element is not complete yet
+                if exhausted:
+                    raise
+            else:
+                yield element
+                buffer = buffer[end:]
+                pos = 0
+                continue
+
+        if exhausted:
+            raise StreamingParseError("Unexpected end of JSON array")
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            buffer += decoder.decode(b'', final=True)
+            exhausted = True
+        else:
+            buffer += decoder.decode(chunk)
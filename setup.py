@@ -8,10 +8,13 @@ setup(
         "requests",
         "tabulate",
         "python-dotenv",
+        "numpy",
     ],
     entry_points={
         "console_scripts": [
             "mlb-odds=mlb_odds.main:main",
+            "mlb-odds-backtest=mlb_odds.backtest:main",
+            "mlb-odds-replay=mlb_odds.replay:main",
         ],
     },
     author="Your Name",